@@ -1,3 +1,4 @@
+import logging
 from logging.config import fileConfig
 import os
 import sys
@@ -23,20 +24,22 @@ from apps.users.models import Base
 import apps
 
 
-# This loop finds all models in all subdirectories of /apps
-for loader, module_name, is_pkg in pkgutil.walk_packages(apps.__path__, apps.__name__ + "."):
-    __import__(module_name)
-    print(f"  -> Loaded: {module_name}")
-
-# Set the metadata for Alembic
-target_metadata = Base.metadata
-
 # 4. ALEMBIC CONFIGURATION
 config = context.config
 
 # Interpret the config file for Python logging.
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
+
+logger = logging.getLogger("alembic.env")
+
+# This loop finds all models in all subdirectories of /apps
+for loader, module_name, is_pkg in pkgutil.walk_packages(apps.__path__, apps.__name__ + "."):
+    __import__(module_name)
+    logger.debug("Loaded: %s", module_name)
+
+# Set the metadata for Alembic
+target_metadata = Base.metadata
     
 db_url = os.getenv('DATABASE_URL')
 if db_url:
@@ -1,4 +1,7 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from database import DATABASE_URL
 
 # 1. Create engine
@@ -10,3 +13,17 @@ async_session = async_sessionmaker(
     expire_on_commit=False
 )
 
+
+async def warm_pool(engine: AsyncEngine, connections: int):
+    """Opens connections at once and returns them to the pool, so first requests skip connect and auth."""
+    opened = []
+
+    async def open_one():
+        conn = await engine.connect()
+        opened.append(conn)
+        await conn.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.gather(*(open_one() for _ in range(connections)))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in opened))
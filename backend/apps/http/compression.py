@@ -0,0 +1,185 @@
+"""
+Response compression negotiated from Accept-Encoding, brotli preferred over gzip.
+Complete bodies below COMPRESSION_MIN_SIZE and content types outside
+COMPRESSIBLE_TYPES go out untouched. Streaming responses are compressed
+chunk by chunk and flushed after each one, so nothing is buffered.
+"""
+import asyncio
+import gzip
+import zlib
+
+import brotli
+
+from config import settings
+
+# Matched against the start of the Content-Type header
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/manifest+json",
+    "image/svg+xml",
+    "text/",
+)
+
+# Complete bodies above this are compressed in a thread, a few ms of CPU per response otherwise stall the loop
+OFFLOAD_SIZE = 256 * 1024
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            encodings[name.strip().lower()] = q
+    return encodings
+
+
+def choose_encoding(header: str) -> str | None:
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = [(accepted.get(name, wildcard), name) for name in ("br", "gzip")]
+    q, name = max(candidates, key=lambda c: c[0])
+    return name if q > 0 else None
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        # wbits 16 + MAX_WBITS writes the gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def make_encoder(encoding: str):
+    if encoding == "br":
+        return BrotliEncoder(settings.COMPRESSION_BROTLI_QUALITY)
+    return GzipEncoder(settings.COMPRESSION_GZIP_LEVEL)
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    """One-shot compression of a complete body."""
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """Pure ASGI, holds back only the response start until the first body chunk shows the size."""
+
+    def __init__(self, app, min_size: int | None = None):
+        self.app = app
+        self.min_size = settings.COMPRESSION_MIN_SIZE if min_size is None else min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = next((value for name, value in scope["headers"] if name == b"accept-encoding"), b"")
+        encoding = choose_encoding(accept.decode("latin-1")) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                passthrough = not self._compressible(start)
+                if passthrough:
+                    await send(start)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None and start is not None:
+                # First body chunk, decide now and send the held back start
+                declared = self._header(start, b"content-length")
+                size = len(body) if not more_body else int(declared) if declared else None
+                if size is not None and size < self.min_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers = self._encoded_headers(start["headers"], encoding)
+                if more_body:
+                    encoder = make_encoder(encoding)
+                else:
+                    if len(body) > OFFLOAD_SIZE:
+                        body = await asyncio.to_thread(compress, encoding, body)
+                    else:
+                        body = compress(encoding, body)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                await send({**start, "headers": headers})
+                start = None
+                if not more_body:
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            chunk = encoder.compress(body) if body else b""
+            if not more_body:
+                chunk += encoder.finish()
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _header(start, name: bytes) -> bytes | None:
+        return next((value for key, value in start.get("headers", []) if key.lower() == name), None)
+
+    def _compressible(self, start) -> bool:
+        if start["status"] < 200 or start["status"] in (204, 206, 304):
+            return False
+        if self._header(start, b"content-encoding") is not None:
+            return False
+        content_type = (self._header(start, b"content-type") or b"").decode("latin-1").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _encoded_headers(headers, encoding: str) -> list:
+        encoded = []
+        vary = None
+        for key, value in headers:
+            key = key.lower()
+            if key == b"content-length":
+                continue
+            if key == b"vary":
+                vary = value
+                continue
+            if key == b"etag" and not value.startswith(b"W/"):
+                # The encoded body differs byte for byte, only a weak validator still holds
+                value = b"W/" + value
+            encoded.append((key, value))
+        encoded.append((b"content-encoding", encoding.encode()))
+        encoded.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        return encoded
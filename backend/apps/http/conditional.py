@@ -0,0 +1,42 @@
+"""Validators and conditional request checks shared by the views answering 304."""
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag of an exact response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def version_etag(*parts) -> str:
+    """Weak ETag derived from row versions (ids, counts, timestamps) rather than the body."""
+    return 'W/"' + hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=16).hexdigest() + '"'
+
+
+def validator_headers(etag: str, last_modified: datetime | None = None, cache_control: str = "no-cache") -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since, compared weakly as GET allows
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
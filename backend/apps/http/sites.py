@@ -0,0 +1,54 @@
+"""
+Isolation of user uploaded sites from the API. Their HTML and scripts are served
+under /api/v1/projects/site/, every response there is sandboxed so a page runs in
+an opaque origin, without the API's cookies. With SITES_HOST set, site paths
+answer only on that host and that host answers nothing else.
+"""
+from starlette.responses import JSONResponse
+
+SITE_PREFIX = "/api/v1/projects/site/"
+
+# Scripts may run, but not as the serving origin: no cookies, storage or same-origin API calls
+SITE_HEADERS = (
+    (b"content-security-policy", b"sandbox allow-scripts"),
+    (b"x-content-type-options", b"nosniff"),
+)
+
+
+def request_host(scope) -> str:
+    host = next((value for name, value in scope["headers"] if name == b"host"), b"").decode("latin-1").lower()
+    # Without the port, IPv6 literals keep their brackets
+    if host.startswith("["):
+        return host[:host.find("]") + 1]
+    return host.partition(":")[0]
+
+
+class SiteIsolationMiddleware:
+    """Pure ASGI, adds SITE_HEADERS to every site response, errors and 304s included."""
+
+    def __init__(self, app, sites_host: str | None = None, prefix: str = SITE_PREFIX):
+        self.app = app
+        self.sites_host = sites_host.lower() if sites_host else None
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        is_site = scope["path"].startswith(self.prefix)
+        if self.sites_host is not None and is_site != (request_host(scope) == self.sites_host):
+            await JSONResponse({"detail": "Not Found"}, status_code=404)(scope, receive, send)
+            return
+        if not is_site:
+            await self.app(scope, receive, send)
+            return
+
+        names = {name for name, _ in SITE_HEADERS}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = [(name, value) for name, value in message.get("headers", []) if name.lower() not in names]
+                message = {**message, "headers": [*headers, *SITE_HEADERS]}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
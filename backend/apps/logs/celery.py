@@ -0,0 +1,34 @@
+"""Logging for Celery processes, and the request id carried from the API into the tasks it enqueues."""
+from celery.signals import before_task_publish, setup_logging, task_prerun, task_postrun
+
+from apps.logs.handlers import configure_logging, request_id
+
+# task_id -> context token, per worker process
+_tokens: dict = {}
+
+
+@setup_logging.connect
+def use_app_logging(loglevel=None, **kwargs):
+    # Connecting this stops Celery from installing its own handlers on the root logger
+    configure_logging(loglevel)
+
+
+@before_task_publish.connect
+def propagate_request_id(headers=None, **kwargs):
+    rid = request_id.get()
+    # Outbox rows arrive with the id of the request that wrote them
+    if headers is not None and rid:
+        headers.setdefault("request_id", rid)
+
+
+@task_prerun.connect
+def bind_request_id(task_id=None, task=None, **kwargs):
+    # Tasks not enqueued from a request are correlated by their own id
+    _tokens[task_id] = request_id.set(getattr(task.request, "request_id", None) or task_id)
+
+
+@task_postrun.connect
+def unbind_request_id(task_id=None, **kwargs):
+    token = _tokens.pop(task_id, None)
+    if token is not None:
+        request_id.reset(token)
@@ -0,0 +1,109 @@
+"""
+Structured logging. Records are queued by the calling thread and formatted to JSON
+and written by a listener thread, so a log call never blocks the event loop on stdout.
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from config import settings
+
+# Set per HTTP request or Celery task, added to every record logged within it
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has, anything else was passed through extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName", "sample_rate"}
+
+_listener: QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the request id, runs in the calling thread before the record is queued."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Drops records logged with extra={"sample_rate": r} with probability 1 - r.
+    Warnings and above are always kept.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        return random.random() < rate
+
+
+class OffloadQueueHandler(QueueHandler):
+    """
+    Enqueues records without formatting them. QueueHandler.prepare would format
+    the message and traceback in the calling thread, the listener does it instead.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Arguments are merged now since they may be mutated once the call returns
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+
+def configure_logging(level: str | None = None):
+    """Routes the root logger through a queue to a JSON stdout handler, once per process."""
+    global _listener
+    if _listener is not None:
+        # Celery configures again with its --loglevel after the app module was imported
+        if level:
+            logging.getLogger().setLevel(level.upper() if isinstance(level, str) else level)
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] [%(request_id)s] %(message)s"))
+
+    records = queue.SimpleQueue()
+    handler = OffloadQueueHandler(records)
+    handler.addFilter(SamplingFilter())
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper() if isinstance(level, str) else level or settings.LOG_LEVEL)
+    # Server and worker loggers go through the same pipeline, the HTTP access log comes from RequestLogMiddleware
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access", "celery"):
+        logger = logging.getLogger(name)
+        logger.handlers.clear()
+        logger.propagate = True
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    # Flushes what is still queued when the process exits
+    atexit.register(_listener.stop)
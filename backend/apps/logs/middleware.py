@@ -0,0 +1,62 @@
+import logging
+import re
+import time
+import uuid
+
+from config import settings
+from apps.logs.handlers import request_id
+
+logger = logging.getLogger("http.access")
+
+# Incoming ids are echoed back and logged, so only short plain tokens are trusted
+_VALID_ID = re.compile(rb"^[A-Za-z0-9._-]{1,64}$")
+
+
+class RequestLogMiddleware:
+    """
+    Assigns every request an id, taken from a valid X-Request-ID header or generated,
+    returns it in the response and writes one access log record per request.
+    Requests are sampled at LOG_SAMPLE_RATE, server errors are always logged.
+    """
+
+    def __init__(self, app, skip_paths: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        incoming = next((value for name, value in scope["headers"] if name == b"x-request-id"), None)
+        rid = incoming.decode() if incoming and _VALID_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(rid)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", rid.encode())]
+            await send(message)
+
+        error = None
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            extra = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", None),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+            if status >= 500:
+                logger.error("request", extra=extra, exc_info=error)
+            else:
+                logger.info("request", extra={**extra, "sample_rate": settings.LOG_SAMPLE_RATE})
+            request_id.reset(token)
@@ -0,0 +1,129 @@
+"""
+Task metrics recorded from Celery signals and aggregated in Redis,
+so every worker process and pool type adds to the same counters.
+The API scrapes them through CeleryCollector.
+"""
+import math
+import os
+import time
+
+import redis
+from celery.signals import before_task_publish, task_prerun, task_postrun
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+from prometheus_client.registry import Collector
+
+# Kept in sync with CELERY_QUEUES and broker_transport_options in main.py
+QUEUES = ("email", "email_bulk", "projects", "maintenance")
+PRIORITY_STEPS = range(10)
+# kombu's Redis transport keeps each priority of a queue in its own list
+PRIORITY_SEP = "\x06\x16"
+
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, math.inf)
+RUN_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, math.inf)
+
+KEY_STATES = "metrics:celery:states"
+KEY_WAIT = "metrics:celery:wait"
+KEY_RUN = "metrics:celery:run"
+
+_client = None
+# task_id -> prerun time, per worker process
+_started: dict[str, float] = {}
+
+
+def get_redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"), socket_connect_timeout=1, socket_timeout=2
+        )
+    return _client
+
+
+def _observe(pipe, key: str, task: str, value: float, buckets: tuple):
+    # Stored cumulative like Prometheus buckets, one field per (task, le)
+    for bound in buckets:
+        if value <= bound:
+            pipe.hincrby(key, f"{task}|{bound}", 1)
+    pipe.hincrbyfloat(key, f"{task}|sum", value)
+
+
+@before_task_publish.connect
+def stamp_enqueue_time(headers=None, **kwargs):
+    if headers is not None:
+        headers["enqueued_at"] = time.time()
+
+
+@task_prerun.connect
+def record_start(task_id=None, task=None, **kwargs):
+    enqueued_at = getattr(task.request, "enqueued_at", None)
+    # Retries are republished, so this is the wait of the current attempt
+    if enqueued_at is not None:
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            _observe(pipe, KEY_WAIT, task.name, max(time.time() - enqueued_at, 0.0), WAIT_BUCKETS)
+            pipe.execute()
+        except redis.RedisError:
+            pass
+    # Taken last so the runtime excludes the write above
+    _started[task_id] = time.time()
+
+
+@task_postrun.connect
+def record_finish(task_id=None, task=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hincrby(KEY_STATES, f"{task.name}|{state}", 1)
+        if started is not None:
+            _observe(pipe, KEY_RUN, task.name, time.time() - started, RUN_BUCKETS)
+        pipe.execute()
+    except redis.RedisError:
+        # Metrics must never fail a task
+        pass
+
+
+def _histogram(name: str, documentation: str, raw: dict, buckets: tuple) -> HistogramMetricFamily:
+    family = HistogramMetricFamily(name, documentation, labels=["task"])
+    tasks = {field.decode().rsplit("|", 1)[0] for field in raw}
+    for task in sorted(tasks):
+        counts = [(("+Inf" if b == math.inf else str(b)), int(raw.get(f"{task}|{b}".encode(), 0))) for b in buckets]
+        family.add_metric([task], counts, float(raw.get(f"{task}|sum".encode(), 0)))
+    return family
+
+
+class CeleryCollector(Collector):
+    """Reads the aggregated task metrics and the live queue lengths at scrape time."""
+
+    def collect(self):
+        client = get_redis()
+        pipe = client.pipeline(transaction=False)
+        pipe.hgetall(KEY_STATES)
+        pipe.hgetall(KEY_WAIT)
+        pipe.hgetall(KEY_RUN)
+        for queue in QUEUES:
+            for step in PRIORITY_STEPS:
+                pipe.llen(queue if step == 0 else f"{queue}{PRIORITY_SEP}{step}")
+        try:
+            states, wait, run, *lengths = pipe.execute()
+        except redis.RedisError:
+            # The API metrics are still worth serving while the broker is down
+            yield GaugeMetricFamily("celery_metrics_up", "Whether task metrics could be read from Redis", value=0)
+            return
+        yield GaugeMetricFamily("celery_metrics_up", "Whether task metrics could be read from Redis", value=1)
+
+        tasks_total = CounterMetricFamily(
+            "celery_tasks", "Finished task runs by final state (SUCCESS, FAILURE, RETRY)", labels=["task", "state"]
+        )
+        for field, value in sorted(states.items()):
+            task, state = field.decode().rsplit("|", 1)
+            tasks_total.add_metric([task, state], int(value))
+        yield tasks_total
+
+        yield _histogram("celery_task_wait_seconds", "Time from publish to the start of a worker run", wait, WAIT_BUCKETS)
+        yield _histogram("celery_task_runtime_seconds", "Time a task spent running", run, RUN_BUCKETS)
+
+        queue_length = GaugeMetricFamily("celery_queue_length", "Messages waiting in the broker", labels=["queue"])
+        steps = len(PRIORITY_STEPS)
+        for i, queue in enumerate(QUEUES):
+            queue_length.add_metric([queue], sum(lengths[i * steps:(i + 1) * steps]))
+        yield queue_length
@@ -0,0 +1,32 @@
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+
+class DatabasePoolCollector(Collector):
+    """Connection pool usage of the SQLAlchemy engines, read at scrape time."""
+
+    def __init__(self, engines: dict):
+        self.engines = engines
+
+    def collect(self):
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=["engine"])
+        checked_in = GaugeMetricFamily("db_pool_checked_in", "Idle connections in the pool", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections opened beyond the pool size", labels=["engine"])
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            checked_in.add_metric([name], pool.checkedin())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield from (size, checked_out, checked_in, overflow)
+
+
+class PasswordHashCollector(Collector):
+    """Backlog of the bcrypt thread pool in apps/users/security.py."""
+
+    def collect(self):
+        from apps.users import security
+
+        yield GaugeMetricFamily("password_hash_queue_depth", "Hash jobs waiting for a thread", value=security.hash_queue.waiting)
+        yield GaugeMetricFamily("password_hash_in_progress", "Hash jobs running", value=security.hash_queue.running)
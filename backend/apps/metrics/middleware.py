@@ -0,0 +1,51 @@
+import time
+
+from apps.metrics.registry import (
+    http_requests,
+    http_request_duration,
+    http_response_size,
+    http_requests_in_flight,
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and response size per route.
+    Streaming responses are measured to their last body chunk.
+    """
+
+    def __init__(self, app, skip_paths: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight = http_requests_in_flight.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            # FastAPI stores the matched route in the scope, unmatched paths share one label
+            route = scope.get("route")
+            route = getattr(route, "path", "unmatched")
+            http_requests.labels(method, route, str(status)).inc()
+            http_request_duration.labels(method, route).observe(elapsed)
+            http_response_size.labels(method, route).observe(size)
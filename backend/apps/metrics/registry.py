@@ -0,0 +1,35 @@
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+from apps.metrics.celery import CeleryCollector
+from apps.metrics.collectors import DatabasePoolCollector, PasswordHashCollector
+
+# Served by /metrics, kept apart from prometheus_client's default registry
+registry = CollectorRegistry()
+registry.register(CeleryCollector())
+registry.register(PasswordHashCollector())
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+# route is the path template (e.g. /api/v1/projects/{project_id}), never the raw path
+http_requests = Counter(
+    "http_requests", "Requests by route and status code", ["method", "route", "status"], registry=registry
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Time to the last response byte", ["method", "route"],
+    buckets=LATENCY_BUCKETS, registry=registry,
+)
+http_response_size = Histogram(
+    "http_response_size_bytes", "Response body size", ["method", "route"],
+    buckets=SIZE_BUCKETS, registry=registry,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "Requests currently being handled", ["method"], registry=registry
+)
+storage_operation_duration = Histogram(
+    "storage_operation_seconds", "Storage backend call latency", ["backend", "operation"],
+    buckets=LATENCY_BUCKETS, registry=registry,
+)
+app_startup_seconds = Gauge(
+    "app_startup_seconds", "Time spent importing the app and running its startup", ["phase"], registry=registry
+)
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from . import views
+
+router = APIRouter()
+
+
+# Sync on purpose, collectors make blocking Redis calls and run in the threadpool
+@router.get("", include_in_schema=False)
+def metrics():
+    return views.metrics_view()
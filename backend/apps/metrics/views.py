@@ -0,0 +1,8 @@
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from apps.metrics.registry import registry
+
+
+def metrics_view():
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
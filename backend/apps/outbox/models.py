@@ -0,0 +1,62 @@
+from datetime import datetime
+import enum
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Enum,
+    Index,
+    Integer,
+    String,
+    text,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from apps.db.base import Base
+
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    # Gave up after OUTBOX_MAX_ATTEMPTS publishes
+    FAILED = "failed"
+
+
+class OutboxMessage(Base):
+    """A Celery task to publish, written in the same transaction as the change that caused it."""
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    task_name: Mapped[str] = mapped_column(String, nullable=False)
+    args: Mapped[list] = mapped_column(JSONB, nullable=False, server_default="[]")
+    kwargs: Mapped[dict] = mapped_column(JSONB, nullable=False, server_default="{}")
+    # Celery message headers of the enqueuing request (trace context, request id), the relay has neither
+    headers: Mapped[dict] = mapped_column(JSONB, nullable=False, server_default="{}")
+    # Rows sharing a key are only enqueued once
+    dedup_key: Mapped[str | None] = mapped_column(String, unique=True, nullable=True)
+    status: Mapped[OutboxStatus] = mapped_column(
+        Enum(OutboxStatus, native_enum=False),
+        default=OutboxStatus.PENDING,
+        server_default=OutboxStatus.PENDING.name,
+        nullable=False,
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    last_error: Mapped[str | None] = mapped_column(String, nullable=True)
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # The relay only ever scans pending rows
+        Index("ix_outbox_pending", "available_at", postgresql_where=text("status = 'PENDING'")),
+    )
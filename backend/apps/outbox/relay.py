@@ -0,0 +1,46 @@
+"""
+Outbox relay, drains the outbox table to Celery so request handlers never talk to the broker.
+
+Run from the backend directory:
+    python -m apps.outbox.relay
+"""
+import asyncio
+
+from config import settings
+from database import AsyncSessionLocal
+from apps.outbox.models import OutboxMessage
+from apps.outbox.services import outbox_task_id, relay_batch
+from apps.logs.handlers import configure_logging
+
+
+def make_publisher(celery_app, producer):
+    def publish(message: OutboxMessage):
+        # A fixed task id per row, so a row published twice (crash before the commit) is recognisable
+        celery_app.send_task(
+            message.task_name,
+            args=message.args,
+            kwargs=message.kwargs,
+            headers=message.headers,
+            task_id=outbox_task_id(message.id),
+            producer=producer,
+        )
+    return publish
+
+
+async def run():
+    # Imported here so importing this module (e.g. from alembic env.py) does not build the app
+    from main import celery_app
+
+    while True:
+        # One broker connection per batch instead of one per message
+        with celery_app.producer_or_acquire() as producer:
+            publish = make_publisher(celery_app, producer)
+            async with AsyncSessionLocal() as db:
+                handled = await relay_batch(db, publish)
+        if handled < settings.OUTBOX_BATCH_SIZE:
+            await asyncio.sleep(settings.OUTBOX_POLL_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(run())
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from apps.logs.handlers import request_id
+from apps.outbox.models import OutboxMessage, OutboxStatus
+from apps.tracing.provider import inject_headers
+
+
+def message_headers() -> dict:
+    """Headers a task published right now would carry, kept with the row for the relay."""
+    headers = {}
+    inject_headers(headers)
+    rid = request_id.get()
+    if rid:
+        headers["request_id"] = rid
+    return headers
+
+
+def outbox_insert(task_name: str, args: list | tuple = (), kwargs: dict | None = None, dedup_key: str | None = None):
+    """
+    INSERT of an outbox row, skipped when dedup_key is already present.
+    A statement rather than an ORM object so mapper events can run it on their connection.
+    """
+    return insert(OutboxMessage.__table__).values(
+        task_name=task_name,
+        args=list(args),
+        kwargs=kwargs or {},
+        headers=message_headers(),
+        dedup_key=dedup_key,
+    ).on_conflict_do_nothing(index_elements=["dedup_key"])
+
+
+async def enqueue(db: AsyncSession, task_name: str, args: list | tuple = (), kwargs: dict | None = None, dedup_key: str | None = None) -> int | None:
+    """
+    Adds a task to the outbox in the caller's transaction. Does not commit.
+    Returns the row id, None when dedup_key was already enqueued.
+    """
+    result = await db.execute(outbox_insert(task_name, args, kwargs, dedup_key).returning(OutboxMessage.id))
+    return result.scalar_one_or_none()
+
+
+def outbox_task_id(message_id: int) -> str:
+    """Celery task id the relay publishes a row under, known before the row is published."""
+    return f"outbox-{message_id}"
+
+
+def outbox_message_id(task_id: str) -> int | None:
+    prefix, _, message_id = task_id.partition("-")
+    return int(message_id) if prefix == "outbox" and message_id.isdigit() else None
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), 3600))
+
+
+async def relay_batch(db: AsyncSession, publish) -> int:
+    """
+    Publishes one batch of due outbox rows with publish(message) and commits the outcome.
+    Rows are locked with SKIP LOCKED so several relays can run side by side.
+    A failed publish is retried with exponential backoff until OUTBOX_MAX_ATTEMPTS.
+    Returns the number of rows handled.
+    """
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(OutboxMessage)
+        .where(OutboxMessage.status == OutboxStatus.PENDING, OutboxMessage.available_at <= now)
+        .order_by(OutboxMessage.available_at, OutboxMessage.id)
+        .limit(settings.OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    messages = result.scalars().all()
+    for message in messages:
+        try:
+            publish(message)
+        except Exception as e:
+            message.attempts += 1
+            message.last_error = str(e)
+            if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                message.status = OutboxStatus.FAILED
+            else:
+                message.available_at = now + _backoff(message.attempts)
+            continue
+        message.status = OutboxStatus.SENT
+        message.sent_at = now
+    await db.commit()
+    return len(messages)
+
+
+async def purge_sent(db: AsyncSession) -> int:
+    result = await db.execute(
+        delete(OutboxMessage).where(
+            OutboxMessage.status == OutboxStatus.SENT,
+            OutboxMessage.sent_at < datetime.now(timezone.utc) - timedelta(days=settings.OUTBOX_RETENTION_DAYS),
+        )
+    )
+    await db.commit()
+    return result.rowcount
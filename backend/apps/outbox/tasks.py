@@ -0,0 +1,18 @@
+from celery import shared_task
+from database import AsyncSessionLocal, engine
+from apps.outbox.services import purge_sent
+import asyncio
+
+
+async def _purge_sent_logic():
+    try:
+        async with AsyncSessionLocal() as db:
+            return await purge_sent(db)
+    finally:
+        await engine.dispose()
+
+
+@shared_task
+def purge_sent_outbox_task():
+    """Deletes outbox rows published more than OUTBOX_RETENTION_DAYS ago."""
+    return f"Removed {asyncio.run(_purge_sent_logic())} sent outbox messages."
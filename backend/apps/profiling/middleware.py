@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+
+import jwt
+from pyinstrument import Profiler
+from redis.exceptions import RedisError
+from starlette.requests import HTTPConnection
+
+from config import settings
+from apps.profiling import store
+
+logger = logging.getLogger(__name__)
+
+# Raw header, matched against the ASGI scope without decoding every header
+TRIGGER_HEADER = b"x-profile"
+ADMIN_ROLES = ("admin",)
+
+
+def _requested(scope) -> bool:
+    if any(name == TRIGGER_HEADER and value in (b"1", b"true") for name, value in scope["headers"]):
+        return True
+    return b"profile=1" in scope.get("query_string", b"").split(b"&")
+
+
+def _is_admin(scope) -> bool:
+    token = HTTPConnection(scope).cookies.get("access_token")
+    if not token:
+        return False
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.PyJWTError:
+        return False
+    return payload.get("role") in ADMIN_ROLES
+
+
+class ProfilingMiddleware:
+    """
+    Runs pyinstrument around a single request when an admin sends "X-Profile: 1"
+    or "?profile=1", and around a PROFILING_SAMPLE_RATE fraction of all requests
+    at a coarser interval. The profiler follows the request's own task only, so
+    concurrent requests on the loop don't show up in its call tree.
+    Requested profiles return their id in the X-Profile-Id response header.
+    """
+
+    def __init__(self, app, skip_paths: tuple[str, ...] = ("/metrics", "/api/v1/profiling")):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_paths):
+            await self.app(scope, receive, send)
+            return
+
+        if _requested(scope) and _is_admin(scope):
+            trigger, interval = "requested", settings.PROFILING_INTERVAL
+        elif settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+            trigger, interval = "sampled", settings.PROFILING_SAMPLED_INTERVAL
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trigger == "requested":
+                    message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = Profiler(interval=interval, async_mode="enabled")
+        started = time.time()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session = profiler.stop()
+            meta = {
+                "id": profile_id,
+                "trigger": trigger,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", scope["path"]),
+                "status": status,
+                "duration": round(session.duration, 6),
+                "created_at": started,
+            }
+            try:
+                # The response is already sent, serializing only holds up this task
+                await store.save_profile(meta, await asyncio.to_thread(store.serialize, meta, session))
+            except RedisError:
+                logger.warning("profile %s not stored", profile_id, exc_info=True)
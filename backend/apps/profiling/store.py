@@ -0,0 +1,59 @@
+"""
+Profiles kept in Redis so any API worker can serve the ones another worker recorded.
+Each profile is a pyinstrument session stored as JSON with a TTL, indexed in a sorted
+set by time and trimmed to PROFILING_MAX_STORED entries.
+"""
+import json
+import os
+import time
+
+import redis.asyncio as redis
+from pyinstrument.session import Session
+
+from config import settings
+
+KEY_INDEX = "profiling:index"
+KEY_PROFILE = "profiling:profile:{}"
+
+_client = None
+
+
+def get_redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"), socket_connect_timeout=1, socket_timeout=2
+        )
+    return _client
+
+
+def serialize(meta: dict, session: Session) -> str:
+    """CPU heavy for long requests, callers run it in a thread."""
+    return json.dumps({"meta": meta, "session": session.to_json()})
+
+
+async def save_profile(meta: dict, payload: str):
+    client = get_redis()
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.set(KEY_PROFILE.format(meta["id"]), payload, ex=settings.PROFILING_TTL)
+        pipe.zadd(KEY_INDEX, {json.dumps(meta): meta["created_at"]})
+        # Oldest entries go first, their profiles expire on their own
+        pipe.zremrangebyrank(KEY_INDEX, 0, -settings.PROFILING_MAX_STORED - 1)
+        await pipe.execute()
+
+
+async def list_profiles(route: str | None = None, limit: int = 50) -> list[dict]:
+    client = get_redis()
+    await client.zremrangebyscore(KEY_INDEX, 0, time.time() - settings.PROFILING_TTL)
+    entries = [json.loads(raw) for raw in await client.zrevrange(KEY_INDEX, 0, -1)]
+    if route:
+        entries = [meta for meta in entries if meta["route"] == route]
+    return entries[:limit]
+
+
+async def load_session(profile_id: str) -> tuple[dict, Session] | None:
+    raw = await get_redis().get(KEY_PROFILE.format(profile_id))
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    return data["meta"], Session.from_json(data["session"])
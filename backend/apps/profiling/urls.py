@@ -0,0 +1,43 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Request
+
+from apps.users.decorators import login_required, role_required
+from . import views
+
+router = APIRouter()
+
+Output = Literal["html", "speedscope", "text"]
+
+
+@router.get("", response_model=list[dict])
+@login_required
+@role_required(["admin"])
+async def list_profiles(
+    request: Request,
+    route: Optional[str] = None,
+    limit: int = 50,
+):
+    return await views.list_profiles_view(route, limit)
+
+
+@router.get("/aggregate")
+@login_required
+@role_required(["admin"])
+async def aggregate_profiles(
+    request: Request,
+    route: str,
+    output: Output = "html",
+):
+    return await views.aggregate_profiles_view(route, output)
+
+
+@router.get("/{profile_id}")
+@login_required
+@role_required(["admin"])
+async def get_profile(
+    profile_id: str,
+    request: Request,
+    output: Output = "html",
+):
+    return await views.get_profile_view(profile_id, output)
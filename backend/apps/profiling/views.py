@@ -0,0 +1,53 @@
+import asyncio
+import functools
+
+from fastapi import HTTPException, Response
+from fastapi.responses import HTMLResponse, PlainTextResponse
+from pyinstrument.renderers import ConsoleRenderer, HTMLRenderer, SpeedscopeRenderer
+from pyinstrument.session import Session
+from redis.exceptions import RedisError
+
+from apps.profiling import store
+
+# Maximum number of stored profiles merged into one aggregate
+AGGREGATE_LIMIT = 50
+
+
+def _render(session: Session, output: str) -> Response:
+    if output == "speedscope":
+        # Flame graph, opens in https://www.speedscope.app
+        return Response(content=SpeedscopeRenderer().render(session), media_type="application/json")
+    if output == "text":
+        return PlainTextResponse(ConsoleRenderer(unicode=True, show_all=False).render(session))
+    return HTMLResponse(HTMLRenderer().render(session))
+
+
+async def list_profiles_view(route: str | None, limit: int):
+    try:
+        return await store.list_profiles(route, limit)
+    except RedisError:
+        raise HTTPException(status_code=503, detail="Profile store unavailable")
+
+
+async def get_profile_view(profile_id: str, output: str):
+    try:
+        loaded = await store.load_session(profile_id)
+    except RedisError:
+        raise HTTPException(status_code=503, detail="Profile store unavailable")
+    if loaded is None:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    _, session = loaded
+    return await asyncio.to_thread(_render, session, output)
+
+
+async def aggregate_profiles_view(route: str, output: str):
+    """Merges the stored profiles of a route, mostly sampled ones, into a single call tree."""
+    try:
+        entries = await store.list_profiles(route, AGGREGATE_LIMIT)
+        loaded = await asyncio.gather(*(store.load_session(entry["id"]) for entry in entries))
+    except RedisError:
+        raise HTTPException(status_code=503, detail="Profile store unavailable")
+    sessions = [session for _, session in filter(None, loaded)]
+    if not sessions:
+        raise HTTPException(status_code=404, detail="No profiles stored for this route")
+    return await asyncio.to_thread(lambda: _render(functools.reduce(Session.combine, sessions), output))
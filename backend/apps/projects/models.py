@@ -1,9 +1,13 @@
 from datetime import datetime
+import enum
+import uuid
 from typing import List, TYPE_CHECKING
 from sqlalchemy import event
 
 from sqlalchemy import (
+    BigInteger,
     DateTime,
+    Enum,
     ForeignKey,
     Integer,
     String,
@@ -19,12 +23,20 @@ from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import Index
 from sqlalchemy.orm.attributes import get_history
+import uuid_utils
 from sqlalchemy.orm import Session, object_session
 
 if TYPE_CHECKING:
     from apps.users.models import Users
 from apps.db.base import Base
 
+class ProjectStatus(str, enum.Enum):
+    ACTIVE = "active"
+    # Files are being purged by a background job, the row goes away when it finishes
+    DELETING = "deleting"
+    DELETE_FAILED = "delete_failed"
+
+
 class Project(Base):
     __tablename__ = "projects"
 
@@ -37,6 +49,19 @@ class Project(Base):
         nullable=False,
     )
 
+    status: Mapped[ProjectStatus] = mapped_column(
+        Enum(ProjectStatus, native_enum=False),
+        default=ProjectStatus.ACTIVE,
+        server_default=ProjectStatus.ACTIVE.name,
+        nullable=False,
+    )
+
+    # Incremented on every redeploy, files of the live deployment carry the same version
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+
+    size_bytes: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0", nullable=False)
+    object_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -52,3 +77,129 @@ class Project(Base):
         back_populates="projects",
     )
 
+    files: Mapped[List["ProjectFile"]] = relationship(
+        "ProjectFile",
+        back_populates="project",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+
+class ProjectFile(Base):
+    """Manifest of the files stored for a project, written at deploy time."""
+    __tablename__ = "project_files"
+    __table_args__ = (
+        Index("ix_project_files_project_id_path", "project_id", "path", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    project_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("projects.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # Relative to the project root, '/' separated
+    path: Mapped[str] = mapped_column(String, nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # sha256 hex digest of the content
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    content_type: Mapped[str] = mapped_column(String, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+
+    project: Mapped["Project"] = relationship(
+        "Project",
+        back_populates="files",
+    )
+
+
+class UploadStatus(str, enum.Enum):
+    OPEN = "open"
+    # Left by sessions completed before chunked uploads were ingested by a worker
+    COMPLETED = "completed"
+    ABORTED = "aborted"
+    EXPIRED = "expired"
+    # Uploads are ingested by a worker after the completion callback
+    INGESTING = "ingesting"
+    PUBLISHED = "published"
+    FAILED = "failed"
+
+
+class UploadSession(Base):
+    """Resumable chunked upload, each chunk is one part of a storage multipart upload."""
+    __tablename__ = "upload_sessions"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid_utils.uuid7,
+    )
+    owner_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id"),
+        nullable=False,
+        index=True,
+    )
+    # Set when the upload redeploys an existing project
+    project_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("projects.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    project_name: Mapped[str] = mapped_column(String, nullable=False)
+    filename: Mapped[str] = mapped_column(String, nullable=False)
+    # Staging key the parts are assembled into
+    storage_key: Mapped[str] = mapped_column(String, nullable=False)
+    # None for direct (pre-signed) uploads, which store the object in one request
+    storage_upload_id: Mapped[str | None] = mapped_column(String, nullable=True)
+    total_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    chunk_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[UploadStatus] = mapped_column(
+        Enum(UploadStatus, native_enum=False),
+        default=UploadStatus.OPEN,
+        nullable=False,
+    )
+    error: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+    )
+
+    parts: Mapped[List["UploadPart"]] = relationship(
+        "UploadPart",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    @property
+    def part_count(self) -> int:
+        return max(-(-self.total_size // self.chunk_size), 1)
+
+
+class UploadPart(Base):
+    __tablename__ = "upload_parts"
+
+    session_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("upload_sessions.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    part_number: Mapped[int] = mapped_column(Integer, primary_key=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    etag: Mapped[str] = mapped_column(String, nullable=False)
+
+    session: Mapped["UploadSession"] = relationship(
+        "UploadSession",
+        back_populates="parts",
+    )
@@ -1,5 +1,18 @@
 from pydantic import BaseModel, EmailStr, ConfigDict
 from datetime import datetime
+from typing import Optional
 
 
+class UploadSessionCreate(BaseModel):
+    name: str
+    filename: str
+    total_size: int
+    chunk_size: Optional[int] = None
+    # Redeploy an existing project instead of creating one
+    project_id: Optional[int] = None
+    model_config = ConfigDict(from_attributes=True)
 
+
+class DirectUploadCreate(UploadSessionCreate):
+    # "POST" (form upload, size enforced by policy) or "PUT" (signed Content-Length)
+    method: str = "POST"
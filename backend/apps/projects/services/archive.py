@@ -0,0 +1,74 @@
+import posixpath
+import stat
+import zipfile
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+
+from config import settings
+
+
+@dataclass
+class ArchiveInfo:
+    # Directory inside the archive holding index.html, "" for the archive root
+    root: str
+    # File entries below root, the only ones worth extracting
+    entries: list[zipfile.ZipInfo]
+    total_size: int
+
+
+def _is_unsafe(name: str) -> bool:
+    if name.startswith(("/", "\\")) or "\\" in name or ":" in name.split("/", 1)[0]:
+        return True
+    return ".." in name.split("/")
+
+
+def validate_zip(file_obj) -> ArchiveInfo:
+    """
+    Validates an archive from its central directory only, nothing is decompressed.
+    Raises 400/413 for malformed archives, zip bombs, path traversal
+    and a missing or ambiguous index.html.
+    """
+    try:
+        zip_ref = zipfile.ZipFile(file_obj, "r")
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Invalid ZIP archive")
+
+    with zip_ref:
+        infos = zip_ref.infolist()
+
+    if len(infos) > settings.ZIP_MAX_ENTRIES:
+        raise HTTPException(status_code=413, detail=f"Archive has more than {settings.ZIP_MAX_ENTRIES} entries")
+
+    files = []
+    total_size = 0
+    for info in infos:
+        if _is_unsafe(info.filename):
+            raise HTTPException(status_code=400, detail=f"Unsafe path in archive: {info.filename}")
+        if info.is_dir():
+            continue
+        if stat.S_ISLNK(info.external_attr >> 16):
+            raise HTTPException(status_code=400, detail=f"Symbolic links are not allowed: {info.filename}")
+        if info.file_size > settings.ZIP_MAX_ENTRY_BYTES:
+            raise HTTPException(status_code=413, detail=f"Archive entry too large: {info.filename}")
+        # Tiny files compress extremely well, only larger entries are ratio checked
+        if info.file_size > 64 * 1024 and info.file_size > settings.ZIP_MAX_COMPRESSION_RATIO * max(info.compress_size, 1):
+            raise HTTPException(status_code=400, detail=f"Suspicious compression ratio: {info.filename}")
+        total_size += info.file_size
+        if total_size > settings.ZIP_MAX_TOTAL_BYTES:
+            raise HTTPException(status_code=413, detail="Archive uncompressed size exceeds the limit")
+        files.append(info)
+
+    roots = {posixpath.dirname(info.filename) for info in files if posixpath.basename(info.filename) == "index.html"}
+    if not roots:
+        raise HTTPException(status_code=400, detail="index.html not found")
+    if len(roots) > 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Multiple index.html files found, ambiguous structure"
+        )
+
+    root = roots.pop()
+    prefix = f"{root}/" if root else ""
+    entries = [info for info in files if info.filename.startswith(prefix)]
+    return ArchiveInfo(root=root, entries=entries, total_size=sum(info.file_size for info in entries))
@@ -0,0 +1,57 @@
+import time
+from collections import OrderedDict
+
+from config import settings
+from apps.projects.services.storage import StoredObject
+
+
+class ByteLRUCache:
+    """
+    In-process LRU bounded by the total size of the cached bodies.
+    Entries also expire after ttl seconds, since invalidation only reaches this process.
+    """
+
+    def __init__(self, max_bytes: int, max_object_bytes: int, ttl: int):
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[float, StoredObject]] = OrderedDict()
+
+    def get(self, key: str) -> StoredObject | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, obj = entry
+        if expires_at < time.monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return obj
+
+    def put(self, obj: StoredObject):
+        if obj.body is None or len(obj.body) > self.max_object_bytes:
+            return
+        self._pop(obj.key)
+        self._entries[obj.key] = (time.monotonic() + self.ttl, obj)
+        self.size += len(obj.body)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._pop(oldest)
+
+    def invalidate_prefix(self, prefix: str):
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            self._pop(key)
+
+    def _pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1].body)
+
+
+# Singleton instance
+site_cache = ByteLRUCache(
+    max_bytes=settings.SITE_CACHE_MAX_BYTES,
+    max_object_bytes=settings.SITE_CACHE_MAX_OBJECT_BYTES,
+    ttl=settings.SITE_CACHE_TTL_SECONDS,
+)
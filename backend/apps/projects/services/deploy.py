@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from apps.projects.models import Project, ProjectFile
+from apps.projects.services.archive import validate_zip
+from apps.projects.services.cache import site_cache
+from apps.projects.services.storage import storage, guess_content_type
+from apps.projects.services.usage import reserve_usage, ensure_quota, release_usage
+from apps.users.models import Activity
+
+
+def find_index_root(base_path: str) -> str:
+    """
+    Returns the directory path that contains index.html
+    Raises error if none or multiple found
+    """
+    matches = []
+
+    for root, _, files in os.walk(base_path):
+        if "index.html" in files:
+            matches.append(root)
+
+    if not matches:
+        raise HTTPException(status_code=400, detail="index.html not found")
+
+    if len(matches) > 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Multiple index.html files found, ambiguous structure"
+        )
+
+    return matches[0]
+
+
+@dataclass
+class DeployedFile:
+    path: str
+    size: int
+    content_hash: str
+    content_type: str
+
+
+def describe_bytes(path: str, content: bytes) -> DeployedFile:
+    return DeployedFile(
+        path=path,
+        size=len(content),
+        content_hash=hashlib.sha256(content).hexdigest(),
+        content_type=guess_content_type(path),
+    )
+
+
+def _scan_directory(root_dir: str) -> list[tuple[str, DeployedFile]]:
+    files = []
+    for root, _, filenames in os.walk(root_dir):
+        for filename in filenames:
+            local_path = os.path.join(root, filename)
+            relative_path = os.path.relpath(local_path, root_dir).replace(os.sep, "/")
+            digest = hashlib.sha256()
+            with open(local_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            files.append((local_path, DeployedFile(
+                path=relative_path,
+                size=os.path.getsize(local_path),
+                content_hash=digest.hexdigest(),
+                content_type=guess_content_type(relative_path),
+            )))
+    return files
+
+
+async def publish_directory(root_dir: str, name: str) -> list[DeployedFile]:
+    """Uploads the contents of root_dir under projects/{name}/ and returns the manifest entries."""
+    # Hashing is CPU and disk bound, keep it off the event loop
+    files = await asyncio.to_thread(_scan_directory, root_dir)
+    await storage.add_many([(local_path, f"projects/{name}/{f.path}") for local_path, f in files])
+    return [f for _, f in files]
+
+
+async def save_manifest(db: AsyncSession, project_id: int, version: int, files: list[DeployedFile]):
+    """Inserts the project_files rows in one executemany. Does not commit."""
+    if not files:
+        return
+    await db.execute(
+        insert(ProjectFile),
+        [
+            {
+                "project_id": project_id,
+                "path": f.path,
+                "size": f.size,
+                "content_hash": f.content_hash,
+                "content_type": f.content_type,
+                "version": version,
+            }
+            for f in files
+        ],
+    )
+
+
+def _measure_upload(file_obj, filename: str):
+    """Validates the upload and returns (archive, content, size, object count) without storing anything."""
+    if filename == "index.html":
+        if file_obj.seek(0, os.SEEK_END) > settings.MAX_FILE_SIZE:
+            raise HTTPException(status_code=413, detail="index.html exceeds the single file limit")
+        file_obj.seek(0)
+        content = file_obj.read()
+        file_obj.seek(0)
+        return None, content, len(content), 1
+    if filename.endswith(".zip"):
+        # Reject bad archives from the central directory, before any DB write or extraction
+        archive = validate_zip(file_obj)
+        file_obj.seek(0)
+        return archive, None, archive.total_size, len(archive.entries)
+    raise HTTPException(
+        status_code=400,
+        detail="Only index.html or ZIP files containing index.html are allowed"
+    )
+
+
+async def deploy_project(db: AsyncSession, owner_id, name: str, file_obj, filename: str, version: int = 1) -> Project:
+    """
+    Creates the project row and publishes an index.html or ZIP upload under projects/{name}/.
+    file_obj is a seekable binary file. The row is removed again if publishing fails.
+    """
+    archive, content, upload_size, upload_objects = _measure_upload(file_obj, filename)
+
+    result = await db.execute(
+        select(Project).where(Project.name == name, Project.owner_id == owner_id)
+    )
+    existing_project = result.scalar_one_or_none()
+    if existing_project:
+        raise HTTPException(status_code=400, detail="Project with this name already exists")
+
+    # Quota is reserved in the same transaction that creates the project
+    await reserve_usage(db, owner_id, upload_size, upload_objects)
+
+    # Create project in DB
+    new_project = Project(
+        name=name,
+        owner_id=owner_id,
+        version=version,
+        size_bytes=upload_size,
+        object_count=upload_objects,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow()
+    )
+    db.add(new_project)
+    await db.commit()
+    await db.refresh(new_project)
+
+    # Temp dir
+    temp_dir = tempfile.mkdtemp()
+    try:
+        if archive is None:
+            await storage.add(file_obj, f"projects/{name}/{filename}")
+            files = [describe_bytes(filename, content)]
+        else:
+            # ZIP upload, only the members below the index.html root are extracted
+            with zipfile.ZipFile(file_obj, "r") as zip_ref:
+                for info in archive.entries:
+                    zip_ref.extract(info, temp_dir)
+
+            root_dir = find_index_root(temp_dir)
+            # Upload ONLY that folder's contents
+            files = await publish_directory(root_dir, name)
+
+        site_cache.invalidate_prefix(f"projects/{name}/")
+        await save_manifest(db, new_project.id, version, files)
+        await db.commit()
+
+    except HTTPException:
+        await db.delete(new_project)
+        await release_usage(db, owner_id, upload_size, upload_objects)
+        await db.commit()
+        raise
+
+    except Exception as e:
+        # Rollback DB if upload fails
+        await db.rollback()
+        await db.delete(new_project)
+        await release_usage(db, owner_id, upload_size, upload_objects)
+        await db.commit()
+        raise HTTPException(status_code=500, detail=f"Storage upload failed: {str(e)}")
+    finally:
+        shutil.rmtree(temp_dir)
+    try:
+        # Log the activity
+        log = Activity(
+            user_id=owner_id,
+            action="NEW PROJECT CREATED:" + name,
+        )
+        db.add(log)
+        await db.commit()
+    except:
+        pass
+
+    return new_project
+
+
+async def redeploy_project(db: AsyncSession, project: Project, file_obj, filename: str) -> Project:
+    """
+    Replaces the files of an existing project. The upload and quota are checked before
+    anything is removed; a failure while publishing the new files leaves no project.
+    """
+    _, _, upload_size, upload_objects = _measure_upload(file_obj, filename)
+    await ensure_quota(
+        db, project.owner_id, upload_size, upload_objects,
+        released_size=project.size_bytes, released_objects=project.object_count,
+    )
+
+    # Delete existing files
+    await storage.delete_prefix(f"projects/{project.name}/")
+    site_cache.invalidate_prefix(f"projects/{project.name}/")
+    # Row, usage and activity change together, a failed commit must not reach deploy_project
+    try:
+        await db.delete(project)
+        await release_usage(db, project.owner_id, project.size_bytes, project.object_count)
+        db.add(Activity(
+            user_id=project.owner_id,
+            action="PROJECT UPDATED: " + project.name,
+        ))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    # Reuse upload logic
+    return await deploy_project(
+        db, project.owner_id, project.name, file_obj, filename, version=project.version + 1
+    )
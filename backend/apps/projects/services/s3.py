@@ -1,41 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+import os
 import aioboto3
-import mimetypes
+from config import settings
+from apps.projects.services.storage import StorageBackend, StoredObject, guess_content_type
 
-class S3Service:
-    def __init__(self, bucket: str, region: str = "us-east-1"):
+class S3Service(StorageBackend):
+    def __init__(self, bucket: str, region: str = "us-east-1", concurrency: int | None = None, endpoint_url: str | None = None):
+        super().__init__(concurrency)
         self.bucket = bucket
         self.region = region
+        # Points at an S3 compatible server (e.g. MinIO) for local runs
+        self.endpoint_url = endpoint_url
         self.session = aioboto3.Session()
 
+    def _client(self):
+        return self.session.client("s3", region_name=self.region, endpoint_url=self.endpoint_url)
+
+    async def _upload(self, client, file_obj, key: str):
+        await client.upload_fileobj(
+            Fileobj=file_obj,
+            Bucket=self.bucket,
+            Key=key,
+            ExtraArgs={"ContentType": guess_content_type(key)}
+        )
+
     async def add(self, file_obj, key: str):
-        content_type, _ = mimetypes.guess_type(key)
-        if content_type is None:
-            content_type = "application/octet-stream"
+        async with self._client() as client:
+            await self._upload(client, file_obj, key)
 
-        async with self.session.client("s3", region_name=self.region) as client:
-            await client.upload_fileobj(
-                Fileobj=file_obj,
-                Bucket=self.bucket,
-                Key=key,
-                ExtraArgs={"ContentType": content_type}
-            )
+    async def add_many(self, items):
+        # One client for the whole batch instead of one per object
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._client() as client:
+            async def _add(source, key):
+                async with semaphore:
+                    if isinstance(source, (str, os.PathLike)):
+                        with open(source, "rb") as f:
+                            await self._upload(client, f, key)
+                    else:
+                        await self._upload(client, source, key)
+
+            await asyncio.gather(*(_add(source, key) for source, key in items))
 
     async def remove(self, key: str):
-        async with self.session.client("s3", region_name=self.region) as client:
+        async with self._client() as client:
             await client.delete_object(Bucket=self.bucket, Key=key)
 
-    async def delete_prefix(self, prefix: str):
-        async with self.session.client("s3", region_name=self.region) as client:
+    async def delete_prefix(self, prefix: str, on_progress=None) -> int:
+        """
+        Listing runs ahead while pages are deleted concurrently, with at most
+        self.concurrency delete_objects calls in flight. Keys that fail are retried.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        deleted = 0
+
+        async with self._client() as client:
+            async def _delete_page(keys):
+                nonlocal deleted
+                try:
+                    for attempt in range(settings.STORAGE_DELETE_RETRIES + 1):
+                        if attempt:
+                            await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+                        try:
+                            response = await client.delete_objects(
+                                Bucket=self.bucket,
+                                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+                            )
+                            failed = {error["Key"] for error in response.get("Errors", [])}
+                        except client.exceptions.ClientError:
+                            failed = set(keys)
+                        deleted += len(keys) - len(failed)
+                        if on_progress:
+                            on_progress(deleted)
+                        if not failed:
+                            return
+                        keys = [key for key in keys if key in failed]
+                    raise RuntimeError(f"Failed to delete {len(keys)} objects under {prefix}")
+                finally:
+                    semaphore.release()
+
+            tasks = []
             paginator = client.get_paginator("list_objects_v2")
             async for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
-                objects = page.get("Contents", [])
-                if not objects:
+                keys = [obj["Key"] for obj in page.get("Contents", [])]
+                if not keys:
                     continue
-                await client.delete_objects(
-                    Bucket=self.bucket,
-                    Delete={"Objects": [{"Key": obj["Key"]} for obj in objects], "Quiet": True},
-                )
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(_delete_page(keys)))
+
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return deleted
+
+    async def list(self, prefix: str) -> list[StoredObject]:
+        objects = []
+        async with self._client() as client:
+            paginator = client.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                for obj in page.get("Contents", []):
+                    objects.append(StoredObject(
+                        key=obj["Key"],
+                        size=obj["Size"],
+                        etag=obj["ETag"].strip('"'),
+                        last_modified=obj["LastModified"],
+                        content_type=guess_content_type(obj["Key"]),
+                    ))
+        return objects
+
+    async def get(self, key: str) -> StoredObject | None:
+        async with self._client() as client:
+            try:
+                response = await client.get_object(Bucket=self.bucket, Key=key)
+            except client.exceptions.NoSuchKey:
+                return None
+            async with response["Body"] as stream:
+                body = await stream.read()
+        return StoredObject(
+            key=key,
+            size=response["ContentLength"],
+            etag=response["ETag"].strip('"'),
+            last_modified=response["LastModified"],
+            content_type=response.get("ContentType") or guess_content_type(key),
+            body=body,
+        )
 
+    async def copy(self, src_key: str, dst_key: str):
+        async with self._client() as client:
+            await client.copy_object(
+                Bucket=self.bucket,
+                Key=dst_key,
+                CopySource={"Bucket": self.bucket, "Key": src_key},
+            )
+
+    async def head(self, key: str) -> StoredObject | None:
+        async with self._client() as client:
+            try:
+                response = await client.head_object(Bucket=self.bucket, Key=key)
+            except client.exceptions.ClientError as e:
+                if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                    return None
+                raise
+        return StoredObject(
+            key=key,
+            size=response["ContentLength"],
+            etag=response["ETag"].strip('"'),
+            last_modified=response["LastModified"],
+            content_type=response.get("ContentType") or guess_content_type(key),
+        )
+
+    async def stream(self, key: str, start: int = 0, end: int | None = None):
+        byte_range = f"bytes={start}-" if end is None else f"bytes={start}-{end}"
+        async with self._client() as client:
+            response = await client.get_object(Bucket=self.bucket, Key=key, Range=byte_range)
+            async with response["Body"] as body:
+                async for chunk in body.iter_chunks(settings.STORAGE_STREAM_CHUNK_SIZE):
+                    yield chunk
+
+    async def create_multipart(self, key: str) -> str:
+        async with self._client() as client:
+            response = await client.create_multipart_upload(
+                Bucket=self.bucket, Key=key, ContentType=guess_content_type(key)
+            )
+        return response["UploadId"]
+
+    async def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        async with self._client() as client:
+            response = await client.upload_part(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=data
+            )
+        return response["ETag"].strip('"')
+
+    async def complete_multipart(self, key: str, upload_id: str, parts: list[tuple[int, str]]):
+        async with self._client() as client:
+            await client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": [
+                    {"PartNumber": part_number, "ETag": f'"{etag}"'} for part_number, etag in sorted(parts)
+                ]},
+            )
+
+    async def abort_multipart(self, key: str, upload_id: str):
+        async with self._client() as client:
+            await client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+    async def presign_upload(self, key: str, size: int, expires_in: int, method: str = "POST") -> dict:
+        content_type = guess_content_type(key)
+        async with self._client() as client:
+            if method == "PUT":
+                # Content-Length is signed, so the client must send exactly size bytes
+                url = await client.generate_presigned_url(
+                    "put_object",
+                    Params={"Bucket": self.bucket, "Key": key, "ContentType": content_type, "ContentLength": size},
+                    ExpiresIn=expires_in,
+                )
+                return {"method": "PUT", "url": url, "fields": {}, "headers": {"Content-Type": content_type}}
+            post = await client.generate_presigned_post(
+                Bucket=self.bucket,
+                Key=key,
+                Fields={"Content-Type": content_type},
+                Conditions=[{"Content-Type": content_type}, ["content-length-range", size, size]],
+                ExpiresIn=expires_in,
+            )
+        return {"method": "POST", "url": post["url"], "fields": post["fields"], "headers": {}}
 
-# Singleton instance
-s3 = S3Service(bucket="aws-manas-generic-sites")
+    async def warm_up(self):
+        # The first client loads botocore's service models, and head_bucket checks credentials and bucket
+        async with self._client() as client:
+            await client.head_bucket(Bucket=self.bucket)
@@ -0,0 +1,454 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import io
+import mimetypes
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from config import settings
+from apps.metrics.registry import storage_operation_duration
+from apps.tracing.provider import tracer
+
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    etag: str
+    last_modified: datetime
+    content_type: str = "application/octet-stream"
+    body: bytes | None = None
+
+
+def guess_content_type(key: str) -> str:
+    content_type, _ = mimetypes.guess_type(key)
+    return content_type or "application/octet-stream"
+
+
+def _timed(backend: str, name: str, method):
+    """Records latency and a trace span for every call of a storage operation."""
+    span_name = f"storage.{name}"
+    attributes = {"storage.backend": backend}
+
+    def observe(elapsed: float):
+        # Labels resolved on use, so backends that never run export no series
+        storage_operation_duration.labels(backend, name).observe(elapsed)
+
+    if inspect.isasyncgenfunction(method):
+        @functools.wraps(method)
+        async def timed_stream(*args, **kwargs):
+            # Not made current, a context attached across yields would leak into the consumer
+            span = tracer.start_span(span_name, attributes=attributes)
+            started = time.perf_counter()
+            try:
+                async for chunk in method(*args, **kwargs):
+                    yield chunk
+            finally:
+                observe(time.perf_counter() - started)
+                span.end()
+        return timed_stream
+
+    @functools.wraps(method)
+    async def timed(*args, **kwargs):
+        with tracer.start_as_current_span(span_name, attributes=attributes):
+            started = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                observe(time.perf_counter() - started)
+    return timed
+
+
+class StorageBackend:
+    """
+    Interface shared by every storage backend.
+    Keys are always '/' separated, e.g. projects/{name}/index.html
+    """
+
+    # Calls exported as storage_operation_seconds and traced, wrapped on every backend class
+    TIMED_OPERATIONS = (
+        "add", "add_many", "remove", "delete_prefix", "list", "get", "copy", "head", "stream",
+        "create_multipart", "upload_part", "complete_multipart", "abort_multipart",
+    )
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.TIMED_OPERATIONS:
+            if name in cls.__dict__:
+                setattr(cls, name, _timed(cls.__name__, name, cls.__dict__[name]))
+
+    def __init__(self, concurrency: int | None = None):
+        self.concurrency = concurrency or settings.STORAGE_CONCURRENCY
+
+    async def add(self, file_obj, key: str):
+        raise NotImplementedError
+
+    async def add_many(self, items):
+        """
+        Upload (source, key) pairs with bounded parallelism.
+        source is either a local file path or an open binary file object.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _add(source, key):
+            async with semaphore:
+                if isinstance(source, (str, os.PathLike)):
+                    with open(source, "rb") as f:
+                        await self.add(f, key)
+                else:
+                    await self.add(source, key)
+
+        await asyncio.gather(*(_add(source, key) for source, key in items))
+
+    async def remove(self, key: str):
+        raise NotImplementedError
+
+    async def delete_prefix(self, prefix: str, on_progress=None) -> int:
+        """
+        Delete every object under prefix, returns the number of deleted objects.
+        on_progress is called with the running count of deleted objects.
+        """
+        raise NotImplementedError
+
+    async def list(self, prefix: str) -> list[StoredObject]:
+        """Metadata (no body) for every object under prefix."""
+        raise NotImplementedError
+
+    async def get(self, key: str) -> StoredObject | None:
+        """Object with its body, None if the key does not exist."""
+        raise NotImplementedError
+
+    async def copy(self, src_key: str, dst_key: str):
+        raise NotImplementedError
+
+    async def head(self, key: str) -> StoredObject | None:
+        """Metadata (no body) of a single object, None if the key does not exist."""
+        raise NotImplementedError
+
+    async def stream(self, key: str, start: int = 0, end: int | None = None):
+        """Async iterator over the bytes start..end (inclusive) of an object, without buffering it."""
+        raise NotImplementedError
+        yield b""
+
+    # Multipart uploads: parts are numbered from 1 and assembled in order on completion
+
+    async def create_multipart(self, key: str) -> str:
+        """Starts a multipart upload for key and returns its upload id."""
+        raise NotImplementedError
+
+    async def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Stores one part and returns its etag, re-uploading a part number replaces it."""
+        raise NotImplementedError
+
+    async def complete_multipart(self, key: str, upload_id: str, parts: list[tuple[int, str]]):
+        """Assembles (part_number, etag) parts into the object at key."""
+        raise NotImplementedError
+
+    async def abort_multipart(self, key: str, upload_id: str):
+        raise NotImplementedError
+
+    async def presign_upload(self, key: str, size: int, expires_in: int, method: str = "POST") -> dict:
+        """
+        Returns {method, url, fields, headers} letting a client upload size bytes to key
+        directly, without going through the API. Only object stores support this.
+        """
+        raise NotImplementedError
+
+    async def warm_up(self):
+        """Pays one-off setup costs (clients, connections) before the first request does."""
+
+
+class MemoryStorage(StorageBackend):
+    """Keeps objects in a dict, for tests and benchmarks on isolated machines."""
+
+    def __init__(self, concurrency: int | None = None):
+        super().__init__(concurrency)
+        self.objects: dict[str, StoredObject] = {}
+        self.multipart: dict[str, dict[int, bytes]] = {}
+
+    async def add(self, file_obj, key: str):
+        body = file_obj.read()
+        self.objects[key] = StoredObject(
+            key=key,
+            size=len(body),
+            etag=hashlib.md5(body).hexdigest(),
+            last_modified=datetime.now(timezone.utc),
+            content_type=guess_content_type(key),
+            body=body,
+        )
+
+    async def remove(self, key: str):
+        self.objects.pop(key, None)
+
+    async def delete_prefix(self, prefix: str, on_progress=None) -> int:
+        keys = [key for key in self.objects if key.startswith(prefix)]
+        for key in keys:
+            del self.objects[key]
+        if on_progress:
+            on_progress(len(keys))
+        return len(keys)
+
+    async def list(self, prefix: str) -> list[StoredObject]:
+        return [
+            StoredObject(
+                key=obj.key,
+                size=obj.size,
+                etag=obj.etag,
+                last_modified=obj.last_modified,
+                content_type=obj.content_type,
+            )
+            for key, obj in sorted(self.objects.items())
+            if key.startswith(prefix)
+        ]
+
+    async def get(self, key: str) -> StoredObject | None:
+        return self.objects.get(key)
+
+    async def copy(self, src_key: str, dst_key: str):
+        obj = self.objects.get(src_key)
+        if obj is None:
+            raise FileNotFoundError(src_key)
+        self.objects[dst_key] = StoredObject(
+            key=dst_key,
+            size=obj.size,
+            etag=obj.etag,
+            last_modified=datetime.now(timezone.utc),
+            content_type=obj.content_type,
+            body=obj.body,
+        )
+
+    async def head(self, key: str) -> StoredObject | None:
+        obj = self.objects.get(key)
+        if obj is None:
+            return None
+        return StoredObject(
+            key=obj.key,
+            size=obj.size,
+            etag=obj.etag,
+            last_modified=obj.last_modified,
+            content_type=obj.content_type,
+        )
+
+    async def stream(self, key: str, start: int = 0, end: int | None = None):
+        body = self.objects[key].body
+        end = len(body) - 1 if end is None else end
+        chunk_size = settings.STORAGE_STREAM_CHUNK_SIZE
+        for offset in range(start, end + 1, chunk_size):
+            yield body[offset:min(offset + chunk_size, end + 1)]
+
+    async def create_multipart(self, key: str) -> str:
+        upload_id = uuid.uuid4().hex
+        self.multipart[upload_id] = {}
+        return upload_id
+
+    async def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        self.multipart[upload_id][part_number] = data
+        return hashlib.md5(data).hexdigest()
+
+    async def complete_multipart(self, key: str, upload_id: str, parts: list[tuple[int, str]]):
+        stored = self.multipart.pop(upload_id)
+        body = b"".join(stored[part_number] for part_number, _ in sorted(parts))
+        await self.add(io.BytesIO(body), key)
+
+    async def abort_multipart(self, key: str, upload_id: str):
+        self.multipart.pop(upload_id, None)
+
+
+class LocalStorage(StorageBackend):
+    """Stores objects as files below root, blocking disk IO runs in a thread."""
+
+    def __init__(self, root: str, concurrency: int | None = None):
+        super().__init__(concurrency)
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, *key.split("/")))
+        if path != self.root and not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def _stat(self, path: str, key: str) -> StoredObject:
+        stat = os.stat(path)
+        return StoredObject(
+            key=key,
+            size=stat.st_size,
+            # Same validator shape nginx uses: mtime + size
+            etag=f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+            last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            content_type=guess_content_type(key),
+        )
+
+    def _write(self, file_obj, key: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            shutil.copyfileobj(file_obj, f)
+
+    def _delete_prefix(self, prefix: str, on_progress=None) -> int:
+        deleted = 0
+        for obj in self._list(prefix):
+            os.remove(self._path(obj.key))
+            deleted += 1
+            if on_progress and deleted % 1000 == 0:
+                on_progress(deleted)
+        if on_progress:
+            on_progress(deleted)
+        return deleted
+
+    def _list(self, prefix: str) -> list[StoredObject]:
+        # Walk only the deepest directory the prefix fully names
+        directory = self._path(prefix.rsplit("/", 1)[0]) if "/" in prefix else self.root
+        objects = []
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                key = self._key(path)
+                if key.startswith(prefix):
+                    objects.append(self._stat(path, key))
+        objects.sort(key=lambda obj: obj.key)
+        return objects
+
+    def _get(self, key: str) -> StoredObject | None:
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+        obj = self._stat(path, key)
+        with open(path, "rb") as f:
+            obj.body = f.read()
+        return obj
+
+    def _copy(self, src_key: str, dst_key: str):
+        dst = self._path(dst_key)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copyfile(self._path(src_key), dst)
+
+    def _part_dir(self, upload_id: str) -> str:
+        # Kept outside projects/ so listings never see in-progress parts
+        return self._path(f".multipart/{upload_id}")
+
+    def _write_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        directory = self._part_dir(upload_id)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{part_number:05d}"), "wb") as f:
+            f.write(data)
+        return hashlib.md5(data).hexdigest()
+
+    def _complete_multipart(self, key: str, upload_id: str, parts: list[tuple[int, str]]):
+        directory = self._part_dir(upload_id)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as out:
+            for part_number, _ in sorted(parts):
+                with open(os.path.join(directory, f"{part_number:05d}"), "rb") as f:
+                    shutil.copyfileobj(f, out)
+        shutil.rmtree(directory)
+
+    def _head(self, key: str) -> StoredObject | None:
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+        return self._stat(path, key)
+
+    async def add(self, file_obj, key: str):
+        await asyncio.to_thread(self._write, file_obj, key)
+
+    async def remove(self, key: str):
+        path = self._path(key)
+        if os.path.isfile(path):
+            await asyncio.to_thread(os.remove, path)
+
+    async def delete_prefix(self, prefix: str, on_progress=None) -> int:
+        return await asyncio.to_thread(self._delete_prefix, prefix, on_progress)
+
+    async def list(self, prefix: str) -> list[StoredObject]:
+        return await asyncio.to_thread(self._list, prefix)
+
+    async def get(self, key: str) -> StoredObject | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def copy(self, src_key: str, dst_key: str):
+        await asyncio.to_thread(self._copy, src_key, dst_key)
+
+    async def head(self, key: str) -> StoredObject | None:
+        return await asyncio.to_thread(self._head, key)
+
+    async def stream(self, key: str, start: int = 0, end: int | None = None):
+        f = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            await asyncio.to_thread(f.seek, start)
+            remaining = None if end is None else end - start + 1
+            chunk_size = settings.STORAGE_STREAM_CHUNK_SIZE
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = await asyncio.to_thread(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    async def create_multipart(self, key: str) -> str:
+        return uuid.uuid4().hex
+
+    async def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        return await asyncio.to_thread(self._write_part, upload_id, part_number, data)
+
+    async def complete_multipart(self, key: str, upload_id: str, parts: list[tuple[int, str]]):
+        await asyncio.to_thread(self._complete_multipart, key, upload_id, parts)
+
+    async def abort_multipart(self, key: str, upload_id: str):
+        await asyncio.to_thread(shutil.rmtree, self._part_dir(upload_id), True)
+
+
+def get_storage(backend: str | None = None) -> StorageBackend:
+    backend = (backend or settings.STORAGE_BACKEND).lower()
+    if backend == "s3":
+        # Imported lazily so local/memory setups don't need aioboto3
+        from apps.projects.services.s3 import S3Service
+        return S3Service(
+            bucket=settings.STORAGE_BUCKET,
+            region=settings.STORAGE_REGION,
+            endpoint_url=settings.STORAGE_ENDPOINT_URL,
+        )
+    if backend == "local":
+        return LocalStorage(root=settings.STORAGE_LOCAL_ROOT)
+    if backend == "memory":
+        return MemoryStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+
+class LazyStorage:
+    """
+    Builds the configured backend on first use. The S3 backend pulls in aioboto3,
+    which workers and scripts that never touch storage should not pay for at import.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._backend: StorageBackend | None = None
+
+    def resolve(self) -> StorageBackend:
+        if self._backend is None:
+            self._backend = self._factory()
+        return self._backend
+
+    def __getattr__(self, name: str):
+        return getattr(self.resolve(), name)
+
+
+# Singleton instance
+storage = LazyStorage(get_storage)
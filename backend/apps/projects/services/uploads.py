@@ -0,0 +1,273 @@
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from apps.projects.models import Project, ProjectStatus, UploadSession, UploadStatus, UploadPart
+from apps.projects.schemas import UploadSessionCreate, DirectUploadCreate
+from apps.projects.services.deploy import deploy_project, redeploy_project
+from apps.projects.services.usage import ensure_quota
+from apps.projects.services.storage import storage
+from apps.outbox.services import enqueue
+
+
+def _max_upload_size(filename: str) -> int:
+    """Largest upload that can still be published, the owner's quota aside."""
+    if filename == "index.html":
+        # A lone index.html is read into memory whole when it is published
+        return min(settings.UPLOAD_MAX_SIZE, settings.MAX_FILE_SIZE)
+    # Members may hold at most ZIP_MAX_TOTAL_BYTES, compressed the archive does not grow past that
+    return min(settings.UPLOAD_MAX_SIZE, settings.ZIP_MAX_TOTAL_BYTES)
+
+
+async def _new_session(db: AsyncSession, owner_id, body: UploadSessionCreate, chunk_size: int) -> UploadSession:
+    if not (body.filename == "index.html" or body.filename.endswith(".zip")):
+        raise HTTPException(
+            status_code=400,
+            detail="Only index.html or ZIP files containing index.html are allowed"
+        )
+    if body.total_size <= 0:
+        raise HTTPException(status_code=400, detail="total_size must be positive")
+    max_size = _max_upload_size(body.filename)
+    if body.total_size > max_size:
+        raise HTTPException(status_code=413, detail=f"File size exceeds the {max_size} byte limit for {body.filename}")
+
+    name = body.name
+    released_size = released_objects = 0
+    if body.project_id is not None:
+        project = await db.get(Project, body.project_id)
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if str(project.owner_id) != str(owner_id):
+            raise HTTPException(status_code=403, detail="Unauthorized")
+        if project.status != ProjectStatus.ACTIVE:
+            raise HTTPException(status_code=409, detail="Project is not active")
+        name = project.name
+        released_size, released_objects = project.size_bytes, project.object_count
+
+    # Fail before anything is uploaded, the upload adds at least total_size bytes and one object.
+    # The exact usage is reserved when the upload is published.
+    await ensure_quota(db, owner_id, body.total_size, 1, released_size, released_objects)
+
+    session = UploadSession(
+        owner_id=owner_id,
+        project_id=body.project_id,
+        project_name=name,
+        filename=body.filename,
+        storage_key="",
+        total_size=body.total_size,
+        chunk_size=chunk_size,
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=settings.UPLOAD_SESSION_TTL_SECONDS),
+    )
+    db.add(session)
+    await db.flush()
+    # Uploads land outside projects/ so the live site is never touched before ingestion
+    session.storage_key = f"staging/{session.id}/{body.filename}"
+    return session
+
+
+async def create_upload_session(db: AsyncSession, owner_id, body: UploadSessionCreate) -> UploadSession:
+    chunk_size = body.chunk_size or settings.UPLOAD_CHUNK_SIZE
+    if not settings.UPLOAD_MIN_CHUNK_SIZE <= chunk_size <= settings.UPLOAD_MAX_CHUNK_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"chunk_size must be between {settings.UPLOAD_MIN_CHUNK_SIZE} and {settings.UPLOAD_MAX_CHUNK_SIZE}",
+        )
+    session = await _new_session(db, owner_id, body, chunk_size)
+    session.storage_upload_id = await storage.create_multipart(session.storage_key)
+    await db.commit()
+    return session
+
+
+async def create_direct_upload(db: AsyncSession, owner_id, body: DirectUploadCreate) -> tuple[UploadSession, dict]:
+    """Session whose file the client uploads straight to storage with a pre-signed request."""
+    method = body.method.upper()
+    if method not in ("POST", "PUT"):
+        raise HTTPException(status_code=400, detail="method must be POST or PUT")
+    # The whole file is a single part
+    session = await _new_session(db, owner_id, body, chunk_size=body.total_size)
+    try:
+        presigned = await storage.presign_upload(
+            session.storage_key, body.total_size, settings.DIRECT_UPLOAD_URL_TTL_SECONDS, method
+        )
+    except NotImplementedError:
+        await db.rollback()
+        raise HTTPException(status_code=501, detail="Direct uploads need an object storage backend")
+    await db.commit()
+    return session, presigned
+
+
+async def get_open_session(db: AsyncSession, session_id, owner_id) -> UploadSession:
+    session = await db.get(UploadSession, session_id)
+    if not session or str(session.owner_id) != str(owner_id):
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    if session.status == UploadStatus.OPEN and session.expires_at <= datetime.now(timezone.utc):
+        raise HTTPException(status_code=410, detail="Upload session expired")
+    if session.status != UploadStatus.OPEN:
+        raise HTTPException(status_code=409, detail=f"Upload session is {session.status.value}")
+    return session
+
+
+async def store_part(db: AsyncSession, session: UploadSession, part_number: int, data: bytes) -> dict:
+    if not 1 <= part_number <= session.part_count:
+        raise HTTPException(status_code=400, detail=f"part_number must be between 1 and {session.part_count}")
+    if part_number < session.part_count:
+        expected = session.chunk_size
+    else:
+        expected = session.total_size - session.chunk_size * (session.part_count - 1)
+    if len(data) != expected:
+        raise HTTPException(status_code=400, detail=f"Part {part_number} must be {expected} bytes")
+
+    etag = await storage.upload_part(session.storage_key, session.storage_upload_id, part_number, data)
+    # Re-sending a part replaces it, so clients can retry blindly
+    stmt = insert(UploadPart).values(
+        session_id=session.id, part_number=part_number, size=len(data), etag=etag
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[UploadPart.session_id, UploadPart.part_number],
+        set_={"size": stmt.excluded.size, "etag": stmt.excluded.etag},
+    ))
+    await db.commit()
+    return {"part_number": part_number, "size": len(data), "etag": etag}
+
+
+async def describe_session(db: AsyncSession, session: UploadSession) -> dict:
+    result = await db.execute(
+        select(UploadPart.part_number, UploadPart.size)
+        .where(UploadPart.session_id == session.id)
+        .order_by(UploadPart.part_number)
+    )
+    parts = dict(result.all())
+    # Contiguous bytes from the start, where a sequential client resumes
+    offset = 0
+    for part_number in range(1, session.part_count + 1):
+        if part_number not in parts:
+            break
+        offset += parts[part_number]
+    return {
+        "upload_id": str(session.id),
+        "mode": "chunked" if session.storage_upload_id else "direct",
+        "status": session.status.value,
+        "error": session.error,
+        "project_id": session.project_id,
+        "project_name": session.project_name,
+        "filename": session.filename,
+        "total_size": session.total_size,
+        "chunk_size": session.chunk_size,
+        "part_count": session.part_count,
+        "received_parts": sorted(parts),
+        "missing_parts": [n for n in range(1, session.part_count + 1) if n not in parts],
+        "received_bytes": sum(parts.values()),
+        "offset": offset,
+        "expires_at": session.expires_at,
+    }
+
+
+async def assemble_session(db: AsyncSession, session: UploadSession):
+    """Completes the storage multipart upload once every part is present."""
+    result = await db.execute(
+        select(UploadPart.part_number, UploadPart.etag).where(UploadPart.session_id == session.id)
+    )
+    parts = result.all()
+    if len(parts) != session.part_count:
+        missing = session.part_count - len(parts)
+        raise HTTPException(status_code=409, detail=f"{missing} parts are still missing")
+    await storage.complete_multipart(session.storage_key, session.storage_upload_id, [tuple(p) for p in parts])
+
+
+async def ingest_staged_upload(db: AsyncSession, session: UploadSession) -> Project:
+    """
+    Publishes the assembled staging object as a new project or a redeploy.
+    The staging object is downloaded to a temp file so the ZIP can be read with seeks.
+    """
+    fd, path = tempfile.mkstemp(suffix=os.path.splitext(session.filename)[1])
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in storage.stream(session.storage_key):
+                f.write(chunk)
+
+        with open(path, "rb") as f:
+            project = await db.get(Project, session.project_id) if session.project_id else None
+            if project:
+                if project.status != ProjectStatus.ACTIVE:
+                    raise HTTPException(status_code=409, detail="Project is not active")
+                project = await redeploy_project(db, project, f, session.filename)
+            else:
+                project = await deploy_project(db, session.owner_id, session.project_name, f, session.filename)
+    finally:
+        os.remove(path)
+        await storage.remove(session.storage_key)
+    return project
+
+
+async def _queue_ingestion(db: AsyncSession, session: UploadSession):
+    session.status = UploadStatus.INGESTING
+    # Queued in the same transaction, a session is never left INGESTING without its task
+    await enqueue(db, "apps.projects.tasks.ingest_upload_task", [str(session.id)], dedup_key=f"ingest:{session.id}")
+    await db.commit()
+
+
+async def complete_upload_session(db: AsyncSession, session: UploadSession):
+    """
+    Assembles the parts and queues the staged object for ingestion. Missing parts
+    leave the session open; the outcome of publishing shows as PUBLISHED or FAILED with its error.
+    """
+    await assemble_session(db, session)
+    await _queue_ingestion(db, session)
+
+
+async def start_ingestion(db: AsyncSession, session: UploadSession):
+    """Completion callback of a direct upload, checks the staged object before it is queued."""
+    obj = await storage.head(session.storage_key)
+    if obj is None:
+        raise HTTPException(status_code=409, detail="File has not been uploaded yet")
+    if obj.size != session.total_size:
+        raise HTTPException(status_code=400, detail=f"Uploaded file is {obj.size} bytes, expected {session.total_size}")
+    await _queue_ingestion(db, session)
+
+
+async def run_ingestion(db: AsyncSession, session_id) -> UploadSession | None:
+    """Worker side of a completed upload: validate, unpack and publish the staged object."""
+    session = await db.get(UploadSession, session_id)
+    if not session or session.status != UploadStatus.INGESTING:
+        return session
+    try:
+        project = await ingest_staged_upload(db, session)
+    except Exception as e:
+        await db.rollback()
+        await db.refresh(session)
+        session.status = UploadStatus.FAILED
+        session.error = e.detail if isinstance(e, HTTPException) else str(e)
+        await db.commit()
+        return session
+    session.status = UploadStatus.PUBLISHED
+    session.project_id = project.id
+    await db.commit()
+    return session
+
+
+async def abort_upload_session(db: AsyncSession, session: UploadSession, status: UploadStatus = UploadStatus.ABORTED):
+    if session.storage_upload_id:
+        await storage.abort_multipart(session.storage_key, session.storage_upload_id)
+    else:
+        await storage.remove(session.storage_key)
+    session.status = status
+    await db.commit()
+
+
+async def expire_upload_sessions(db: AsyncSession) -> int:
+    result = await db.execute(
+        select(UploadSession).where(
+            UploadSession.status == UploadStatus.OPEN,
+            UploadSession.expires_at <= datetime.now(timezone.utc),
+        )
+    )
+    sessions = result.scalars().all()
+    for session in sessions:
+        await abort_upload_session(db, session, UploadStatus.EXPIRED)
+    return len(sessions)
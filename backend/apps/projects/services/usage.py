@@ -0,0 +1,196 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from apps.projects.models import Project, ProjectStatus
+from apps.projects.services.storage import StorageBackend
+from apps.users.models import Users
+
+
+def _quota_bytes():
+    return func.coalesce(Users.storage_quota_bytes, settings.STORAGE_QUOTA_BYTES)
+
+
+async def reserve_usage(db: AsyncSession, user_id, size: int, objects: int, released_size: int = 0, released_objects: int = 0):
+    """
+    Adds usage to a user only if the result stays within quota, in one conditional UPDATE.
+    released_* is usage being freed by the same operation (e.g. a redeploy replacing files).
+    Raises 413 when the quota would be exceeded. Does not commit.
+    """
+    size_delta = size - released_size
+    objects_delta = objects - released_objects
+    result = await db.execute(
+        update(Users)
+        .where(
+            Users.id == user_id,
+            Users.storage_bytes + size_delta <= _quota_bytes(),
+            Users.storage_objects + objects_delta <= settings.STORAGE_QUOTA_OBJECTS,
+        )
+        .values(
+            storage_bytes=Users.storage_bytes + size_delta,
+            storage_objects=Users.storage_objects + objects_delta,
+            updated_at=Users.updated_at,
+        )
+        .returning(Users.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=413, detail="Storage quota exceeded")
+
+
+async def ensure_quota(db: AsyncSession, user_id, size: int, objects: int, released_size: int = 0, released_objects: int = 0):
+    """Read-only version of reserve_usage, for checks that must happen before anything is changed."""
+    row = (await db.execute(
+        select(Users.storage_bytes, Users.storage_objects, _quota_bytes())
+        .where(Users.id == user_id)
+    )).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    storage_bytes, storage_objects, quota_bytes = row
+    if (
+        storage_bytes + size - released_size > quota_bytes
+        or storage_objects + objects - released_objects > settings.STORAGE_QUOTA_OBJECTS
+    ):
+        raise HTTPException(status_code=413, detail="Storage quota exceeded")
+
+
+async def release_usage(db: AsyncSession, user_id, size: int, objects: int):
+    """Subtracts usage from a user. Does not commit."""
+    await db.execute(
+        update(Users)
+        .where(Users.id == user_id)
+        .values(
+            storage_bytes=func.greatest(Users.storage_bytes - size, 0),
+            storage_objects=func.greatest(Users.storage_objects - objects, 0),
+            updated_at=Users.updated_at,
+        )
+    )
+
+
+async def get_usage(db: AsyncSession, user_id) -> dict:
+    row = (await db.execute(
+        select(Users.storage_bytes, Users.storage_objects, _quota_bytes())
+        .where(Users.id == user_id)
+    )).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    storage_bytes, storage_objects, quota_bytes = row
+    return {
+        "storage_bytes": storage_bytes,
+        "storage_objects": storage_objects,
+        "quota_bytes": quota_bytes,
+        "quota_objects": settings.STORAGE_QUOTA_OBJECTS,
+    }
+
+
+async def _locked_unchanged(db: AsyncSession, model, columns, snapshot: dict) -> dict:
+    """
+    Locks the rows in snapshot (id -> counters read earlier) with SELECT ... FOR UPDATE
+    and returns id -> updated_at of those whose counters still match.
+    Rows changed in the meantime by reserve_usage/release_usage are left for the next run.
+    """
+    if not snapshot:
+        return {}
+    rows = await db.execute(
+        select(model.id, *columns, model.updated_at)
+        .where(model.id.in_(snapshot))
+        .order_by(model.id)
+        .with_for_update()
+    )
+    return {row[0]: row[-1] for row in rows if tuple(row[1:-1]) == snapshot[row[0]]}
+
+
+def _settled(cutoff: datetime):
+    # Active and untouched since the cutoff: no deploy, redeploy or purge is still moving its files
+    return and_(Project.status == ProjectStatus.ACTIVE, Project.updated_at < cutoff).label("settled")
+
+
+async def reconcile_usage(db: AsyncSession, store: StorageBackend) -> dict:
+    """
+    Recomputes project and user counters from one listing of the projects/ prefix
+    and writes only the rows that drifted. Objects without a project row are ignored.
+
+    Usage is reserved before a deploy uploads and released after a purge deleted,
+    so a listing taken meanwhile sees part of the files. Projects that are not active
+    or changed within USAGE_RECONCILE_SETTLE_SECONDS are therefore not corrected,
+    and neither are their owners. Drifted rows are locked and compared again before
+    they are written; rows whose counters or, for users, set of settled projects
+    changed since the snapshot are skipped until the next run.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.USAGE_RECONCILE_SETTLE_SECONDS)
+    projects = (await db.execute(
+        select(Project.id, Project.name, Project.owner_id, Project.size_bytes, Project.object_count, _settled(cutoff))
+    )).all()
+    users = (await db.execute(select(Users.id, Users.storage_bytes, Users.storage_objects))).all()
+    # The snapshot is not held open over the listing
+    await db.commit()
+
+    sizes = defaultdict(int)
+    counts = defaultdict(int)
+    for obj in await store.list("projects/"):
+        name = obj.key.split("/", 2)[1]
+        sizes[name] += obj.size
+        counts[name] += 1
+
+    user_bytes = defaultdict(int)
+    user_objects = defaultdict(int)
+    owned = defaultdict(set)
+    unsettled_owners = set()
+    # id -> counters as read, for the rows that drifted
+    drifted_projects = {}
+    for project_id, name, owner_id, size_bytes, object_count, settled in projects:
+        user_bytes[owner_id] += sizes[name]
+        user_objects[owner_id] += counts[name]
+        owned[owner_id].add(project_id)
+        if not settled:
+            unsettled_owners.add(owner_id)
+        elif (size_bytes, object_count) != (sizes[name], counts[name]):
+            drifted_projects[project_id] = (size_bytes, object_count)
+    names = {project_id: name for project_id, name, *_ in projects}
+
+    drifted_users = {}
+    for user_id, storage_bytes, storage_objects in users:
+        if user_id in unsettled_owners:
+            continue
+        if (storage_bytes, storage_objects) != (user_bytes[user_id], user_objects[user_id]):
+            drifted_users[user_id] = (storage_bytes, storage_objects)
+
+    # Users before projects, the order deploys and deletes lock them in
+    unchanged_users = await _locked_unchanged(db, Users, (Users.storage_bytes, Users.storage_objects), drifted_users)
+    if unchanged_users:
+        # A redeploy replaces the row and may leave the counters as they were, its new row shows here
+        current = defaultdict(set)
+        for owner_id, project_id, settled in await db.execute(
+            select(Project.owner_id, Project.id, _settled(cutoff)).where(Project.owner_id.in_(unchanged_users))
+        ):
+            current[owner_id].add(project_id if settled else None)
+        unchanged_users = {
+            user_id: updated_at for user_id, updated_at in unchanged_users.items() if current[user_id] == owned[user_id]
+        }
+    unchanged_projects = await _locked_unchanged(db, Project, (Project.size_bytes, Project.object_count), drifted_projects)
+
+    # updated_at is passed through so bookkeeping does not look like a content change
+    user_rows = [
+        {"id": user_id, "storage_bytes": user_bytes[user_id], "storage_objects": user_objects[user_id], "updated_at": updated_at}
+        for user_id, updated_at in unchanged_users.items()
+    ]
+    project_rows = [
+        {"id": project_id, "size_bytes": sizes[names[project_id]], "object_count": counts[names[project_id]], "updated_at": updated_at}
+        for project_id, updated_at in unchanged_projects.items()
+    ]
+
+    # Bulk UPDATE by primary key, one executemany per table
+    if user_rows:
+        await db.execute(update(Users), user_rows)
+    if project_rows:
+        await db.execute(update(Project), project_rows)
+    await db.commit()
+    return {
+        "projects_corrected": len(project_rows),
+        "users_corrected": len(user_rows),
+        "skipped_changed": len(drifted_projects) + len(drifted_users) - len(project_rows) - len(user_rows),
+        "skipped_unsettled": sum(not settled for *_, settled in projects),
+    }
@@ -0,0 +1,114 @@
+from celery import shared_task
+from sqlalchemy import select
+from database import AsyncSessionLocal, engine
+from apps.projects.models import Project, ProjectStatus
+from apps.projects.services.storage import storage
+from apps.projects.services.usage import release_usage, reconcile_usage
+from apps.projects.services.uploads import expire_upload_sessions, run_ingestion
+from apps.users.models import Activity
+import asyncio
+import uuid
+
+
+async def _purge_project_logic(project_id: int, on_progress=None):
+    """
+    Deletes every stored object of a project marked as deleting,
+    then removes the project row.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            project = await db.scalar(select(Project).where(Project.id == project_id))
+            if not project:
+                return {"status": "deleted", "deleted_objects": 0}
+
+            deleted = await storage.delete_prefix(f"projects/{project.name}/", on_progress=on_progress)
+
+            await db.delete(project)
+            await release_usage(db, project.owner_id, project.size_bytes, project.object_count)
+            # Log the activity
+            log = Activity(
+                user_id=project.owner_id,
+                action="PROJECT DELETED: " + project.name,
+            )
+            db.add(log)
+            await db.commit()
+            return {"status": "deleted", "project": project.name, "deleted_objects": deleted}
+    finally:
+        # Pooled connections belong to this event loop, which asyncio.run closes
+        await engine.dispose()
+
+
+async def _mark_delete_failed(project_id: int):
+    try:
+        async with AsyncSessionLocal() as db:
+            project = await db.get(Project, project_id)
+            if project:
+                project.status = ProjectStatus.DELETE_FAILED
+                await db.commit()
+    finally:
+        await engine.dispose()
+
+
+@shared_task(bind=True, max_retries=3)
+def purge_project_task(self, project_id: int, owner_id: str):
+    """
+    Background purge started by delete_project_view.
+    Progress is reported as a PROGRESS state with the deleted object count.
+    """
+    def on_progress(deleted: int):
+        self.update_state(state="PROGRESS", meta={"owner_id": owner_id, "deleted_objects": deleted})
+
+    try:
+        result = asyncio.run(_purge_project_logic(project_id, on_progress))
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=10 * 2 ** self.request.retries)
+        asyncio.run(_mark_delete_failed(project_id))
+        result = {"status": ProjectStatus.DELETE_FAILED.value, "error": str(e)}
+    result["owner_id"] = owner_id
+    return result
+
+
+async def _reconcile_usage_logic():
+    try:
+        async with AsyncSessionLocal() as db:
+            return await reconcile_usage(db, storage)
+    finally:
+        await engine.dispose()
+
+
+@shared_task
+def reconcile_storage_usage_task():
+    """Periodic job correcting drift of the incremental usage counters."""
+    return asyncio.run(_reconcile_usage_logic())
+
+
+async def _expire_uploads_logic():
+    try:
+        async with AsyncSessionLocal() as db:
+            return await expire_upload_sessions(db)
+    finally:
+        await engine.dispose()
+
+
+@shared_task
+def expire_upload_sessions_task():
+    """Aborts the storage multipart uploads of sessions past their expiry."""
+    return f"Expired {asyncio.run(_expire_uploads_logic())} upload sessions."
+
+
+async def _ingest_upload_logic(session_id: str):
+    try:
+        async with AsyncSessionLocal() as db:
+            session = await run_ingestion(db, uuid.UUID(session_id))
+            if session is None:
+                return {"status": "missing"}
+            return {"status": session.status.value, "project_id": session.project_id, "error": session.error}
+    finally:
+        await engine.dispose()
+
+
+@shared_task
+def ingest_upload_task(session_id: str):
+    """Publishes a chunked or direct upload once the client reported it complete."""
+    return asyncio.run(_ingest_upload_logic(session_id))
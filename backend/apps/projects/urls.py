@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, Request, Form, UploadFile, File
+from fastapi import APIRouter, Depends, Request, Response, Form, UploadFile, File
+from typing import Optional
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
-from . import views
+from . import views, schemas
 from apps.users.decorators import login_required, role_required
 
 router = APIRouter()
@@ -23,10 +25,64 @@ async def delete_project(project_id: int, request: Request, db: AsyncSession = D
     return await views.delete_project_view(project_id=project_id, db=db, request=request)
 
 
+@router.post("/uploads", response_model=dict)
+@login_required
+async def create_upload_session(body: schemas.UploadSessionCreate, request: Request, db: AsyncSession = Depends(get_db)):
+    return await views.create_upload_session_view(body=body, db=db, request=request)
+
+
+@router.post("/uploads/direct", response_model=dict)
+@login_required
+async def create_direct_upload(body: schemas.DirectUploadCreate, request: Request, db: AsyncSession = Depends(get_db)):
+    return await views.create_direct_upload_view(body=body, db=db, request=request)
+
+
+@router.post("/uploads/{session_id}/ingest", response_model=dict)
+@login_required
+async def ingest_direct_upload(session_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    return await views.ingest_direct_upload_view(session_id=session_id, db=db, request=request)
+
+
+@router.put("/uploads/{session_id}/parts/{part_number}", response_model=dict)
+@login_required
+async def upload_part(session_id: uuid.UUID, part_number: int, request: Request, db: AsyncSession = Depends(get_db)):
+    return await views.upload_part_view(session_id=session_id, part_number=part_number, db=db, request=request)
+
+
+@router.get("/uploads/{session_id}", response_model=dict)
+@login_required
+async def get_upload_session(session_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    return await views.get_upload_session_view(session_id=session_id, db=db, request=request)
+
+
+@router.post("/uploads/{session_id}/complete", response_model=dict)
+@login_required
+async def complete_upload_session(session_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    return await views.complete_upload_session_view(session_id=session_id, db=db, request=request)
+
+
+@router.delete("/uploads/{session_id}", response_model=dict)
+@login_required
+async def abort_upload_session(session_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    return await views.abort_upload_session_view(session_id=session_id, db=db, request=request)
+
+
+@router.get("/delete/status/{task_id}", response_model=dict)
+@login_required
+async def get_delete_status(task_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    return await views.get_delete_status_view(task_id=task_id, db=db, request=request)
+
+
+@router.get("/usage", response_model=dict)
+@login_required
+async def get_usage(request: Request, db: AsyncSession = Depends(get_db)):
+    return await views.get_usage_view(db=db, request=request)
+
+
 @router.get("/all", response_model=dict)
 @login_required
-async def get_all_projects(request: Request, db: AsyncSession = Depends(get_db)):
-    return await views.get_all_project_view(db=db, request=request)
+async def get_all_projects(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    return await views.get_all_project_view(db=db, request=request, response=response)
 
 
 @router.get("/admin/user/{user_email}", response_model=dict)
@@ -34,3 +90,31 @@ async def get_all_projects(request: Request, db: AsyncSession = Depends(get_db))
 @role_required("admin")
 async def get_user_project(user_email: str, request: Request, db: AsyncSession = Depends(get_db)):
     return await views.get_user_project_view(db=db, request=request, user_email=user_email)
+
+
+@router.get("/site/{name}/{path:path}")
+async def serve_site(name: str, path: str, request: Request):
+    return await views.serve_site_view(name=name, path=path, request=request)
+
+
+# Kept last, "/{project_id}" would otherwise shadow the static paths above
+@router.get("/{project_id}/files", response_model=dict)
+@login_required
+async def get_project_files(
+    project_id: int,
+    request: Request,
+    page: int = 1,
+    page_size: int = 100,
+    prefix: Optional[str] = None,
+    q: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await views.get_project_files_view(
+        project_id=project_id, db=db, request=request, page=page, page_size=page_size, prefix=prefix, q=q
+    )
+
+
+@router.get("/{project_id}", response_model=dict)
+@login_required
+async def get_project_details(project_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    return await views.get_project_details_view(project_id=project_id, db=db, request=request)
@@ -1,123 +1,40 @@
-from fastapi import HTTPException, Request, UploadFile
+from fastapi import HTTPException, Request, UploadFile, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import datetime
-from apps.projects.models import Project
+from sqlalchemy import select, func
+from apps.projects.models import Project, ProjectStatus, ProjectFile
+from apps.projects.tasks import purge_project_task
+from celery.result import AsyncResult
 from apps.users.models import Users, Activity
-from apps.projects.services.s3 import s3
-import zipfile
-import os
-import shutil
-import tempfile
+from apps.outbox.models import OutboxMessage, OutboxStatus
+from apps.outbox.services import enqueue, outbox_message_id, outbox_task_id
+from apps.projects.services.storage import storage
+from apps.projects.services.cache import site_cache
+from apps.http.conditional import is_conditional, not_modified, validator_headers, version_etag
+from apps.projects.services.deploy import deploy_project, redeploy_project
+from apps.projects.services.usage import get_usage
+from apps.projects.services.uploads import (
+    create_upload_session,
+    get_open_session,
+    store_part,
+    describe_session,
+    complete_upload_session,
+    abort_upload_session,
+    create_direct_upload,
+    start_ingestion,
+)
+from apps.projects.schemas import UploadSessionCreate, DirectUploadCreate
+from apps.projects.models import UploadSession
+from config import settings
 
-def find_index_root(base_path: str) -> str:
-    """
-    Returns the directory path that contains index.html
-    Raises error if none or multiple found
-    """
-    matches = []
-
-    for root, _, files in os.walk(base_path):
-        if "index.html" in files:
-            matches.append(root)
-
-    if not matches:
-        raise HTTPException(status_code=400, detail="index.html not found")
-
-    if len(matches) > 1:
-        raise HTTPException(
-            status_code=400,
-            detail="Multiple index.html files found, ambiguous structure"
-        )
-
-    return matches[0]
-MAX_FILE_SIZE = int(eval(os.getenv("MAX_FILE_SIZE", '20 * 1024 * 1024')))
 async def upload_project_view(name: str, file: UploadFile, db: AsyncSession, request: Request):
-    is_index = file.filename == "index.html"
-    is_zip = file.filename.endswith(".zip")
-    content = await file.read()
-    file_size = len(content)
-    if file_size > MAX_FILE_SIZE:
+    if file.size > settings.MAX_FILE_SIZE:
         raise HTTPException(
             status_code=413, # Payload Too Large
             detail="File size exceeds the 20MB limit."
         )
-    await file.seek(0)
-    if not (is_index or is_zip):
-        raise HTTPException(
-            status_code=400,
-            detail="Only index.html or ZIP files containing index.html are allowed"
-        )
-    
-    result = await db.execute(
-        select(Project).where(Project.name == name, Project.owner_id == request.state.user_id)
-    )
-    existing_project = result.scalar_one_or_none()
-    if existing_project:
-        raise HTTPException(status_code=400, detail="Project with this name already exists")
-
-    # Create project in DB
-    new_project = Project(
-        name=name,
-        owner_id=request.state.user_id,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow()
-    )
-    db.add(new_project)
-    await db.commit()
-    await db.refresh(new_project)
-
-    # Temp dir
-    temp_dir = tempfile.mkdtemp()
-    try:
-        if is_index:
-            s3_key = f"projects/{name}/{file.filename}"
-            await s3.add(file.file, s3_key)
-        else:
-            # ZIP upload
-            zip_path = os.path.join(temp_dir, file.filename)
-            with open(zip_path, "wb") as f:
-                f.write(await file.read())
-
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall(temp_dir)
-
-            root_dir = find_index_root(temp_dir)
-            # Upload ONLY that folder's contents
-            for root, _, files in os.walk(root_dir):
-                for filename in files:
-                    local_path = os.path.join(root, filename)
-
-                    relative_path = os.path.relpath(local_path, root_dir)
-                    s3_key = f"projects/{name}/{relative_path.replace(os.sep, '/')}"
-
-                    with open(local_path, "rb") as f:
-                        await s3.add(f, s3_key)
-
-    except HTTPException:
-        await db.delete(new_project)
-        await db.commit()
-        raise
+    new_project = await deploy_project(db, request.state.user_id, name, file.file, file.filename)
 
-    except Exception as e:
-        # Rollback DB if upload fails
-        await db.delete(new_project)
-        await db.commit()
-        raise HTTPException(status_code=500, detail=f"S3 upload failed: {str(e)}")
-    finally:
-        shutil.rmtree(temp_dir)
-    try:
-        # Log the activity
-        log = Activity(
-            user_id=request.state.user_id,
-            action="NEW PROJECT CREATED:" + name,
-        )
-        db.add(log)
-        await db.commit()
-    except:
-        pass
-    
-    
     return {
         "message": "Project created and file uploaded successfully",
         "project_id": new_project.id,
@@ -135,52 +52,186 @@ async def update_project_view(
 
     if str(project.owner_id) != request.state.user_id:
         raise HTTPException(status_code=403, detail="Unauthorized")
+
+    if project.status != ProjectStatus.ACTIVE:
+        raise HTTPException(status_code=409, detail="Project is not active")
     
-    if file.size > MAX_FILE_SIZE:
+    if file.size > settings.MAX_FILE_SIZE:
         raise HTTPException(
             status_code=413, # Payload Too Large
             detail="File size exceeds the 20MB limit."
         )
+    await redeploy_project(db, project, file.file, file.filename)
 
-    # Delete existing files
-    await s3.delete_prefix(f"projects/{project.name}/")
-        # Reuse upload logic
-    await db.delete(project)
-    try:
-        # Log the activity
-        log = Activity(
-            user_id=request.state.user_id,
-            action="PROJECT UPDATED: " + project.name,
-        )
-        db.add(log)
-        await db.commit()
-    except:
-        pass
-    await db.commit()
-    await upload_project_view(
-        name=project.name,
-        file=file,
-        db=db,
-        request=request
-    )
+    return {"message": "Project updated successfully"}
 
 
-    # project.updated_at = datetime.utcnow()
-    # await db.commit()
 
-    return {"message": "Project updated successfully"}
+async def create_upload_session_view(body: UploadSessionCreate, db: AsyncSession, request: Request):
+    session = await create_upload_session(db, request.state.user_id, body)
+    return await describe_session(db, session)
+
+
+async def create_direct_upload_view(body: DirectUploadCreate, db: AsyncSession, request: Request):
+    session, presigned = await create_direct_upload(db, request.state.user_id, body)
+    return {
+        "upload_id": str(session.id),
+        "expires_at": session.expires_at,
+        **presigned,
+    }
+
+
+async def ingest_direct_upload_view(session_id, db: AsyncSession, request: Request):
+    session = await get_open_session(db, session_id, request.state.user_id)
+    if session.storage_upload_id:
+        raise HTTPException(status_code=400, detail="Chunked uploads are completed with /complete")
+    await start_ingestion(db, session)
+    return {"upload_id": str(session.id), "status": session.status.value}
+
+
+async def upload_part_view(session_id, part_number: int, db: AsyncSession, request: Request):
+    session = await get_open_session(db, session_id, request.state.user_id)
+    data = await request.body()
+    return await store_part(db, session, part_number, data)
+
+
+async def get_upload_session_view(session_id, db: AsyncSession, request: Request):
+    session = await db.get(UploadSession, session_id)
+    if not session or str(session.owner_id) != request.state.user_id:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return await describe_session(db, session)
+
+
+async def complete_upload_session_view(session_id, db: AsyncSession, request: Request):
+    session = await get_open_session(db, session_id, request.state.user_id)
+    if not session.storage_upload_id:
+        raise HTTPException(status_code=400, detail="Direct uploads are completed with /ingest")
+    await complete_upload_session(db, session)
+    return {"upload_id": str(session.id), "status": session.status.value}
+
 
+async def abort_upload_session_view(session_id, db: AsyncSession, request: Request):
+    session = await get_open_session(db, session_id, request.state.user_id)
+    await abort_upload_session(db, session)
+    return {"message": "Upload session aborted"}
 
 
-async def get_all_project_view(db: AsyncSession, request: Request):
+async def get_usage_view(db: AsyncSession, request: Request):
+    return await get_usage(db, request.state.user_id)
+
+
+def _projects_etag(count: int, last_id: int | None, last_modified, total_bytes: int, total_objects: int) -> str:
+    # Count and highest id catch deletions and creations, the latest updated_at any change to a row.
+    # Usage reconciliation keeps updated_at, the size totals catch its corrections.
+    return version_etag("projects", count, last_id, last_modified, total_bytes, total_objects)
+
+
+async def get_all_project_view(db: AsyncSession, request: Request, response: Response):
+    owner_id = request.state.user_id
+    if is_conditional(request):
+        # Validators from one aggregate over the owner's rows, the list is only loaded when it changed
+        count, last_id, last_modified, total_bytes, total_objects = (await db.execute(
+            select(
+                func.count(Project.id), func.max(Project.id), func.max(Project.updated_at),
+                func.coalesce(func.sum(Project.size_bytes), 0), func.coalesce(func.sum(Project.object_count), 0),
+            )
+            .where(Project.owner_id == owner_id)
+        )).one()
+        etag = _projects_etag(count, last_id, last_modified, total_bytes, total_objects)
+        if not_modified(request, etag, last_modified):
+            return Response(status_code=304, headers=validator_headers(etag, last_modified, "private, no-cache"))
+
     result = await db.execute(
-        select(Project).where(Project.owner_id == request.state.user_id).order_by(Project.id.desc())
+        select(Project).where(Project.owner_id == owner_id).order_by(Project.id.desc())
     )
     all_projects = result.scalars().all()
+    last_modified = max((p.updated_at for p in all_projects), default=None)
+    etag = _projects_etag(
+        len(all_projects), max((p.id for p in all_projects), default=None), last_modified,
+        sum(p.size_bytes for p in all_projects), sum(p.object_count for p in all_projects),
+    )
+    headers = validator_headers(etag, last_modified, "private, no-cache")
+    response.headers.update(headers)
     if not all_projects:
-        raise HTTPException(status_code=200, detail="No projects exist for you")
+        raise HTTPException(status_code=200, detail="No projects exist for you", headers=headers)
+
+    return {"projects": [project_summary(p) for p in all_projects]}
+
+
+def project_summary(p: Project) -> dict:
+    return {"id": p.id, "name": p.name, "status": p.status.value, "size_bytes": p.size_bytes, "object_count": p.object_count, "created_at": p.created_at}
+
+
+def _ensure_can_view(project: Project | None, request: Request):
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if str(project.owner_id) != request.state.user_id and request.state.user_role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view this project")
+
 
-    return {"projects": [{"id": p.id, "name": p.name, "created_at": p.created_at} for p in all_projects]}
+async def get_project_details_view(project_id: int, db: AsyncSession, request: Request):
+    # Project plus its manifest summary in a single query
+    row = (await db.execute(
+        select(Project, func.count(ProjectFile.id), func.coalesce(func.sum(ProjectFile.size), 0))
+        .outerjoin(ProjectFile, ProjectFile.project_id == Project.id)
+        .where(Project.id == project_id)
+        .group_by(Project.id)
+    )).one_or_none()
+    project, file_count, total_size = row if row else (None, 0, 0)
+    _ensure_can_view(project, request)
+
+    return {
+        "id": project.id,
+        "name": project.name,
+        "status": project.status.value,
+        "version": project.version,
+        "file_count": file_count,
+        "total_size": total_size,
+        "created_at": project.created_at,
+        "updated_at": project.updated_at,
+    }
+
+
+async def get_project_files_view(
+    project_id: int,
+    db: AsyncSession,
+    request: Request,
+    page: int = 1,
+    page_size: int = 100,
+    prefix: str | None = None,
+    q: str | None = None,
+):
+    project = await db.get(Project, project_id)
+    _ensure_can_view(project, request)
+
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), 500)
+    stmt = select(ProjectFile, func.count().over().label("total")).where(ProjectFile.project_id == project_id)
+    if prefix:
+        # Served by the (project_id, path) index
+        stmt = stmt.where(ProjectFile.path.startswith(prefix, autoescape=True))
+    if q:
+        stmt = stmt.where(ProjectFile.path.icontains(q, autoescape=True))
+    stmt = stmt.order_by(ProjectFile.path).offset((page - 1) * page_size).limit(page_size)
+    rows = (await db.execute(stmt)).all()
+
+    return {
+        "project_id": project_id,
+        "version": project.version,
+        "page": page,
+        "page_size": page_size,
+        "total": rows[0].total if rows else 0,
+        "files": [
+            {
+                "path": f.path,
+                "size": f.size,
+                "content_hash": f.content_hash,
+                "content_type": f.content_type,
+                "version": f.version,
+            }
+            for f, _ in rows
+        ],
+    }
 
 
 async def get_user_project_view(db: AsyncSession, request: Request, user_email: str):
@@ -193,7 +244,7 @@ async def get_user_project_view(db: AsyncSession, request: Request, user_email:
 
     return {
         "user_email": user_email,
-        "projects": [{"id": p.id, "name": p.name, "created_at": p.created_at} for p in projects]
+        "projects": [{"id": p.id, "name": p.name, "status": p.status.value, "size_bytes": p.size_bytes, "object_count": p.object_count, "created_at": p.created_at} for p in projects]
     }
 
 
@@ -204,25 +255,124 @@ async def delete_project_view(project_id: int, db: AsyncSession, request: Reques
     if str(project.owner_id) != request.state.user_id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this project")
 
-    try:
-        await s3.delete_prefix(f"projects/{project.name}/")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete project files from S3: {str(e)}")
+    if project.status == ProjectStatus.DELETING:
+        raise HTTPException(status_code=409, detail="Project is already being deleted")
 
     try:
-        await db.delete(project)
-
-        # Log the activity
-        log = Activity(
-            user_id=request.state.user_id,
-            action="PROJECT DELETED: " + project.name,
-        )
-        db.add(log)
-        await db.commit()
-
+        project.status = ProjectStatus.DELETING
+        # Files are purged in the background, the row is removed once they are gone.
+        # Queued in the same transaction, a project is never left DELETING without its task.
+        message_id = await enqueue(db, purge_project_task.name, [project.id, str(project.owner_id)])
         await db.commit()
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete project from database: {str(e)}")
+    site_cache.invalidate_prefix(f"projects/{project.name}/")
 
-    return {"message": f"Project '{project.name}' deleted successfully"}
+    return {
+        "message": f"Project '{project.name}' is being deleted",
+        "status": project.status.value,
+        "task_id": outbox_task_id(message_id),
+    }
+
+
+async def get_delete_status_view(task_id: str, db: AsyncSession, request: Request):
+    message_id = outbox_message_id(task_id)
+    if message_id is not None:
+        message = await db.get(OutboxMessage, message_id)
+        if not message or message.task_name != purge_project_task.name or message.args[1] != request.state.user_id:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if message.status == OutboxStatus.PENDING:
+            # Not handed to Celery yet, its result backend knows nothing about it
+            return {"task_id": task_id, "state": "QUEUED", "attempts": message.attempts}
+        if message.status == OutboxStatus.FAILED:
+            return {"task_id": task_id, "state": "FAILURE", "error": message.last_error}
+
+    result = AsyncResult(task_id, app=purge_project_task.app)
+    # PROGRESS and SUCCESS carry a dict with the owner, RETRY/FAILURE only an exception
+    info = result.info if isinstance(result.info, dict) else {}
+    if "owner_id" in info and info["owner_id"] != request.state.user_id:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    response = {"task_id": task_id, "state": result.state}
+    response.update({key: value for key, value in info.items() if key != "owner_id"})
+    return response
+
+
+def _parse_range(range_header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parses a single 'bytes=start-end' range into inclusive offsets.
+    Returns None for multi-range or malformed headers, the full body is served then.
+    Raises 416 when the range cannot be satisfied.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    unsatisfiable = HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    if size == 0:
+        # No byte of an empty object can be addressed, not even a suffix
+        raise unsatisfiable
+    start, _, end = spec.strip().partition("-")
+    try:
+        if start == "":
+            # Suffix range: last N bytes
+            length = int(end)
+            if length <= 0:
+                raise ValueError
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise unsatisfiable
+    return start, min(end, size - 1)
+
+
+def _unsafe_segment(value: str) -> bool:
+    # Storage keys map onto directories in LocalStorage, these would leave the project's prefix
+    return "\\" in value or "\x00" in value or ".." in value.split("/")
+
+
+async def serve_site_view(name: str, path: str, request: Request):
+    if _unsafe_segment(name) or "/" in name or _unsafe_segment(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    if not path or path.endswith("/"):
+        path += "index.html"
+    key = f"projects/{name}/{path}"
+
+    obj = site_cache.get(key)
+    if obj is None:
+        obj = await storage.head(key)
+        if obj is None:
+            raise HTTPException(status_code=404, detail="File not found")
+        if obj.size <= settings.SITE_CACHE_MAX_OBJECT_BYTES:
+            obj = await storage.get(key)
+            if obj is None:
+                raise HTTPException(status_code=404, detail="File not found")
+            site_cache.put(obj)
+
+    etag = f'"{obj.etag}"'
+    headers = {**validator_headers(etag, obj.last_modified), "Accept-Ranges": "bytes"}
+    if not_modified(request, etag, obj.last_modified):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A stale If-Range means the client's partial copy is outdated, send the full body
+    if range_header and (not if_range or if_range == etag):
+        byte_range = _parse_range(range_header, obj.size)
+
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{obj.size}"
+        headers["Content-Length"] = str(end - start + 1)
+        if obj.body is not None:
+            return Response(obj.body[start:end + 1], status_code=206, headers=headers, media_type=obj.content_type)
+        return StreamingResponse(storage.stream(key, start, end), status_code=206, headers=headers, media_type=obj.content_type)
+
+    if obj.body is not None:
+        return Response(obj.body, headers=headers, media_type=obj.content_type)
+    headers["Content-Length"] = str(obj.size)
+    return StreamingResponse(storage.stream(key), headers=headers, media_type=obj.content_type)
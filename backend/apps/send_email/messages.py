@@ -0,0 +1,81 @@
+import os
+import uuid
+from email import quoprimime
+from email.header import Header
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+SENDER = "<noreply@theallset.in>"
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+# Templates never change at runtime, so compiled templates are cached for the life of the process
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    undefined=StrictUndefined,
+    auto_reload=False,
+)
+env.globals["base_url"] = os.getenv("FRONTEND_BASE_URL", "http://localhost:5173")
+
+
+def _encode_header(value: str) -> str:
+    return value if value.isascii() else Header(value, "utf-8").encode()
+
+
+def _encode_body(body: str) -> str:
+    # quoprimime works on characters, feed it the utf-8 bytes as latin-1
+    return quoprimime.body_encode(body.encode("utf-8").decode("latin-1"))
+
+
+class EmailTemplate:
+    """
+    A multipart/alternative email with plain and HTML parts, compiled once per process.
+    The MIME frame (content types, boundary, part headers) is static and built here,
+    render only fills in the subject, recipient and the two bodies.
+    """
+
+    def __init__(self, name: str, subject: str):
+        self.name = name
+        self.subject = env.from_string(subject)
+        self.text = env.get_template(f"{name}.txt")
+        self.html = env.get_template(f"{name}.html")
+
+        boundary = f"==============={uuid.uuid4().hex}=="
+        part = 'Content-Type: text/{}; charset="utf-8"\nMIME-Version: 1.0\nContent-Transfer-Encoding: quoted-printable\n\n'
+        self._head = f'Content-Type: multipart/alternative; boundary="{boundary}"\nMIME-Version: 1.0\n'
+        self._text_part = f"\n--{boundary}\n" + part.format("plain")
+        self._html_part = f"\n--{boundary}\n" + part.format("html")
+        self._tail = f"\n--{boundary}--\n"
+
+    def render(self, recipient: str, context: dict) -> str:
+        """Returns the message as a string ready for sendmail."""
+        if "\n" in recipient or "\r" in recipient:
+            raise ValueError("Invalid recipient")
+        context = {"email": recipient, **context}
+        return "".join((
+            self._head,
+            f"Subject: {_encode_header(self.subject.render(context))}\nFrom: {SENDER}\nTo: {recipient}\n",
+            self._text_part,
+            _encode_body(self.text.render(context)),
+            self._html_part,
+            _encode_body(self.html.render(context)),
+            self._tail,
+        ))
+
+
+TEMPLATES = {
+    template.name: template
+    for template in (
+        EmailTemplate("activation", "Activate Your Account"),
+        EmailTemplate("invitation", "You have been invited"),
+        EmailTemplate("password_reset", "Reset Your Password"),
+    )
+}
+
+
+def render_email(recipient: str, template: str, context: dict) -> str:
+    try:
+        email_template = TEMPLATES[template]
+    except KeyError:
+        raise ValueError(f"Unknown email template: {template}")
+    return email_template.render(recipient, context)
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+
+import aiosmtplib
+from opentelemetry import context as otel_context
+from opentelemetry.trace import SpanKind
+
+from apps.tracing.provider import run_in_context, tracer
+
+# Errors after which a connection can not be reused
+CONNECTION_ERRORS = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, aiosmtplib.SMTPTimeoutError, OSError)
+
+
+class PooledConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Async SMTP sessions kept open between messages, one pool per worker process.
+    Up to max_in_flight messages are sent concurrently, each on its own connection.
+    Connections idle for longer than idle_check are probed with NOOP before reuse,
+    and a connection is retired after max_messages so servers limiting messages per session are respected.
+    Must only be used from one event loop, see EventLoopThread.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str | None = None,
+        password: str | None = None,
+        starttls: bool = True,
+        max_in_flight: int = 100,
+        max_messages: int = 100,
+        idle_check: float = 5.0,
+        max_idle: float = 60.0,
+        timeout: float = 30.0,
+        send_timeout: float = 60.0,
+    ):
+        self.host = host
+        self.port = int(port)
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.max_in_flight = max_in_flight
+        self.max_messages = max_messages
+        self.idle_check = idle_check
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.send_timeout = send_timeout
+        self._idle: list[PooledConnection] = []
+        # Created on first use so it binds to the loop the pool runs on
+        self._slots: asyncio.Semaphore | None = None
+
+    async def _connect(self) -> PooledConnection:
+        smtp = aiosmtplib.SMTP(hostname=self.host, port=self.port, timeout=self.timeout, start_tls=self.starttls)
+        await smtp.connect()
+        try:
+            if self.user:
+                await smtp.login(self.user, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        return PooledConnection(smtp)
+
+    @staticmethod
+    async def _discard(conn: PooledConnection):
+        try:
+            await conn.smtp.quit()
+        except Exception:
+            conn.smtp.close()
+
+    async def _is_alive(self, conn: PooledConnection) -> bool:
+        idle = time.monotonic() - conn.last_used
+        if idle > self.max_idle or not conn.smtp.is_connected:
+            return False
+        if idle < self.idle_check:
+            return True
+        try:
+            return (await conn.smtp.noop()).code == 250
+        except CONNECTION_ERRORS:
+            return False
+
+    async def _checkout(self) -> PooledConnection:
+        while self._idle:
+            conn = self._idle.pop()
+            if await self._is_alive(conn):
+                return conn
+            await self._discard(conn)
+        return await self._connect()
+
+    async def _checkin(self, conn: PooledConnection):
+        conn.last_used = time.monotonic()
+        if conn.sent >= self.max_messages:
+            await self._discard(conn)
+            return
+        self._idle.append(conn)
+
+    async def _send_once(self, from_addr: str, to_addrs: list[str], msg: str):
+        conn = await self._checkout()
+        try:
+            refused = await conn.smtp.sendmail(from_addr, to_addrs, msg)
+        except (*CONNECTION_ERRORS, asyncio.CancelledError):
+            # Also reached when send_timeout cancels us mid-conversation, the session state is unknown
+            conn.smtp.close()
+            raise
+        except Exception:
+            await self._checkin(conn)
+            raise
+        conn.sent += 1
+        await self._checkin(conn)
+        return refused
+
+    async def sendmail(self, from_addr: str, to_addrs: list[str], msg: str):
+        """
+        Sends one message within send_timeout, waiting for a free slot first.
+        Retried once on a fresh connection if the server hung up.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        with tracer.start_as_current_span("smtp.send", kind=SpanKind.CLIENT, attributes={"smtp.recipients": len(to_addrs)}):
+            async with self._slots:
+                for attempt in range(2):
+                    try:
+                        return await asyncio.wait_for(self._send_once(from_addr, to_addrs, msg), self.send_timeout)
+                    except aiosmtplib.SMTPServerDisconnected:
+                        if attempt:
+                            raise
+
+    async def sendmail_many(self, messages: list[tuple[str, list[str], str]]) -> list:
+        """Sends (from_addr, to_addrs, msg) tuples concurrently, returns the result or the exception of each."""
+        return await asyncio.gather(*(self.sendmail(*m) for m in messages), return_exceptions=True)
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._discard(conn) for conn in idle))
+
+
+class EventLoopThread:
+    """
+    A persistent event loop on a daemon thread, started on first use.
+    Sync Celery tasks submit coroutines to it, so connections outlive a single task
+    and tasks running on a thread pool share the same loop and SMTP pool.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True).start()
+            return self._loop
+
+    def run(self, coro):
+        """Runs coro on the loop and blocks the calling thread for its result, under the caller's trace context."""
+        coro = run_in_context(coro, otel_context.get_current())
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def stop(self):
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
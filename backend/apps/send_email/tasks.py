@@ -1,9 +1,11 @@
-from celery import shared_task
+from celery import group, shared_task
+from celery.signals import worker_process_shutdown
 import time
 import os
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+
+from config import settings
+from .messages import SENDER, render_email
+from .pool import EventLoopThread, SMTPConnectionPool
 
 # SMTP Configuration (Use environment variables for security)
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp-relay.sendinblue.com")
@@ -11,36 +13,68 @@ SMTP_PORT = os.getenv("SMTP_PORT", 587)
 SMTP_USER = os.getenv("SMTP_USER")
 SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")
 
+# One loop and pool per worker process, both start lazily so forked children never share sockets
+email_loop = EventLoopThread("smtp-loop")
+smtp_pool = SMTPConnectionPool(
+    SMTP_SERVER,
+    SMTP_PORT,
+    SMTP_USER,
+    SENDER_PASSWORD,
+    starttls=settings.SMTP_STARTTLS,
+    max_in_flight=settings.EMAIL_MAX_IN_FLIGHT,
+    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    max_idle=settings.SMTP_MAX_IDLE_SECONDS,
+    timeout=settings.SMTP_TIMEOUT,
+    send_timeout=settings.EMAIL_SEND_TIMEOUT,
+)
+
+
+@worker_process_shutdown.connect
+def close_smtp_pool(**kwargs):
+    email_loop.run(smtp_pool.close())
+    email_loop.stop()
+
+
 @shared_task
-def send_email_task(email: str, token: str):
-    msg = MIMEMultipart("alternative")
-    BASE_URL = os.getenv("FRONTEND_BASE_URL", "http://localhost:5173")
-    activation_link = f"{BASE_URL}/activate?user_email={email}&activation_token={token}"
-    msg["Subject"] = "Activate Your Account"
-    msg["From"] = "<noreply@theallset.in>"
-    msg["To"] = email
-    text_content = f"Hello! Please activate your account by clicking Below."
-    html_content = f"""
-    <html>
-      <body>
-        <p>Hello!</p>
-        <p>Please click the button below to activate your account:</p>
-        <a href="{activation_link}" 
-           style="background-color: #4CAF50; color: white; padding: 10px 20px; text-decoration: none; border-radius: 5px;">
-           Activate Account
-        </a>
-        <br>
-        <p>Thank you!</p>
-      </body>
-    </html>
-    """
-    msg.attach(MIMEText(text_content, "plain"))
-    msg.attach(MIMEText(html_content, "html"))
+def send_template_email_task(email: str, template: str, context: dict):
     try:
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SENDER_PASSWORD)
-            server.sendmail(msg["From"], [email], msg.as_string())
+        email_loop.run(smtp_pool.sendmail(SENDER, [email], render_email(email, template, context)))
         return {"status": "sent", "to": email}
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+
+@shared_task
+def send_email_task(email: str, token: str):
+    """Activation email."""
+    return send_template_email_task(email, "activation", {"token": token})
+
+
+@shared_task(acks_late=False)
+def send_bulk_email_task(items: list):
+    """
+    Sends a batch of [recipient, template, context] items concurrently over the worker's SMTP pool.
+    A failing recipient is recorded and the batch carries on.
+    """
+    failed = []
+    recipients = []
+    messages = []
+    for recipient, template, context in items:
+        try:
+            messages.append((SENDER, [recipient], render_email(recipient, template, context)))
+            recipients.append(recipient)
+        except Exception as e:
+            failed.append({"to": recipient, "error": str(e)})
+
+    results = email_loop.run(smtp_pool.sendmail_many(messages))
+    for recipient, result in zip(recipients, results):
+        if isinstance(result, BaseException):
+            failed.append({"to": recipient, "error": str(result) or type(result).__name__})
+    return {"status": "done", "sent": len(items) - len(failed), "failed": failed}
+
+
+def send_bulk_email(items: list, batch_size: int | None = None):
+    """Splits items into batches and queues one send_bulk_email_task per batch, so workers share a mass send."""
+    batch_size = batch_size or settings.EMAIL_BULK_BATCH_SIZE
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    return group(send_bulk_email_task.s(batch) for batch in batches).apply_async()
@@ -0,0 +1,67 @@
+"""Spans for SQLAlchemy statements and Celery tasks, hooked in through their event systems."""
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from celery.signals import before_task_publish, task_prerun, task_postrun
+from sqlalchemy import event
+
+from apps.tracing.provider import extract_context, inject_headers, tracer
+
+# task_id -> (span, context token), per worker process
+_task_spans: dict = {}
+
+
+def instrument_engine(engine):
+    """Span per statement, async engines are hooked through their sync_engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.lstrip().split(" ", 1)[0].upper()
+        span = tracer.start_span(f"sql {operation}", kind=SpanKind.CLIENT, attributes={
+            "db.system": "postgresql",
+            "db.statement": statement,
+        })
+        context._otel_span = span
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def end_statement(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_otel_span", None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def fail_statement(exception_context):
+        span = getattr(exception_context.execution_context, "_otel_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+
+@before_task_publish.connect
+def propagate_trace(headers=None, **kwargs):
+    # Outbox rows arrive with the context of the request that wrote them
+    if headers is not None and "traceparent" not in headers:
+        inject_headers(headers)
+
+
+@task_prerun.connect
+def start_task_span(task_id=None, task=None, **kwargs):
+    carrier = {key: getattr(task.request, key) for key in ("traceparent", "tracestate") if getattr(task.request, key, None)}
+    span = tracer.start_span(f"celery.run {task.name}", context=extract_context(carrier), kind=SpanKind.CONSUMER)
+    token = otel_context.attach(trace.set_span_in_context(span))
+    _task_spans[task_id] = (span, token)
+
+
+@task_postrun.connect
+def end_task_span(task_id=None, state=None, **kwargs):
+    entry = _task_spans.pop(task_id, None)
+    if entry is None:
+        return
+    span, token = entry
+    span.set_attribute("celery.state", state or "")
+    if state == "FAILURE":
+        span.set_status(Status(StatusCode.ERROR))
+    span.end()
+    otel_context.detach(token)
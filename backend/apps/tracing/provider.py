@@ -0,0 +1,66 @@
+"""
+OpenTelemetry setup. Tracing is off unless TRACING_ENABLED is set, in which case
+the API returns no-op spans and the instrumentation costs next to nothing.
+"""
+import json
+import threading
+from typing import Sequence
+
+from opentelemetry import context as otel_context
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from config import settings
+
+tracer = trace.get_tracer("backend")
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """Appends finished spans as JSON lines, so traces can be read without a collector."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(json.dumps(json.loads(span.to_json())) + "\n" for span in spans)
+        with self._lock, open(self.path, "a") as f:
+            f.write(lines)
+        return SpanExportResult.SUCCESS
+
+
+def configure_tracing(service_name: str | None = None):
+    if not settings.TRACING_ENABLED:
+        return
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name or settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    if settings.TRACING_EXPORTER == "console":
+        exporter = ConsoleSpanExporter()
+    else:
+        exporter = JsonFileSpanExporter(settings.TRACING_FILE)
+    # Exports from a background thread, never on the request path
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+
+def inject_headers(headers: dict):
+    """Writes the current trace context (traceparent/tracestate) into headers."""
+    propagate.inject(headers)
+
+
+def extract_context(carrier: dict):
+    return propagate.extract(carrier)
+
+
+async def run_in_context(coro, ctx):
+    """Awaits coro with ctx as the current trace context, for work handed to another loop or thread."""
+    token = otel_context.attach(ctx)
+    try:
+        return await coro
+    finally:
+        otel_context.detach(token)
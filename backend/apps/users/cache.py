@@ -0,0 +1,126 @@
+"""
+Shared Redis cache of the anonymous reviews feed, held as the serialized JSON body and its ETag.
+
+An entry is fresh for REVIEWS_CACHE_TTL_SECONDS and then served stale for up to
+REVIEWS_CACHE_STALE_SECONDS while a single request rebuilds it in the background.
+Writes bump a version counter instead of deleting the entry, so a rebuild that
+started before the write can not store outdated data: entries of an older version
+count as missing. A miss is rebuilt by whoever takes the lock, the others wait for it.
+"""
+import asyncio
+import logging
+import os
+import time
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from config import settings
+from apps.http.conditional import body_etag
+
+logger = logging.getLogger(__name__)
+
+KEY_ENTRY = "cache:reviews:public"
+KEY_VERSION = "cache:reviews:public:version"
+KEY_LOCK = "cache:reviews:public:lock"
+
+# Longest a rebuild may hold the lock, and how long a miss waits for another worker's rebuild
+LOCK_SECONDS = 10
+WAIT_SECONDS = 2.0
+WAIT_STEP = 0.05
+
+_client = None
+# Background rebuilds, referenced until done so they are not garbage collected
+_refreshing: set[asyncio.Task] = set()
+
+
+def get_redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"), socket_connect_timeout=1, socket_timeout=2
+        )
+    return _client
+
+
+async def _read(client) -> tuple[dict | None, int]:
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.hgetall(KEY_ENTRY)
+        pipe.get(KEY_VERSION)
+        entry, version = await pipe.execute()
+    version = int(version or 0)
+    if not entry or int(entry[b"version"]) != version:
+        return None, version
+    return entry, version
+
+
+async def _rebuild(client, version: int, build) -> dict:
+    body = await build()
+    entry = {
+        b"body": body,
+        b"etag": body_etag(body).encode(),
+        b"version": str(version).encode(),
+        b"fresh_until": str(time.time() + settings.REVIEWS_CACHE_TTL_SECONDS).encode(),
+    }
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.hset(KEY_ENTRY, mapping=entry)
+            pipe.expire(KEY_ENTRY, settings.REVIEWS_CACHE_TTL_SECONDS + settings.REVIEWS_CACHE_STALE_SECONDS)
+            pipe.delete(KEY_LOCK)
+            await pipe.execute()
+    except RedisError:
+        logger.warning("reviews feed not cached", exc_info=True)
+    return entry
+
+
+async def _refresh_in_background(client, version: int, build):
+    try:
+        await _rebuild(client, version, build)
+    except Exception:
+        # The lock expires on its own, a later request retries
+        logger.exception("reviews feed refresh failed")
+
+
+async def get_public_reviews(build) -> tuple[bytes, str]:
+    """
+    Returns (body, etag) of the feed, build is an async callable producing the JSON body.
+    Falls back to build when Redis is unavailable.
+    """
+    client = get_redis()
+    try:
+        entry, version = await _read(client)
+        if entry is not None:
+            if float(entry[b"fresh_until"]) < time.time() and await client.set(KEY_LOCK, 1, nx=True, ex=LOCK_SECONDS):
+                task = asyncio.create_task(_refresh_in_background(client, version, build))
+                _refreshing.add(task)
+                task.add_done_callback(_refreshing.discard)
+            return entry[b"body"], entry[b"etag"].decode()
+
+        if await client.set(KEY_LOCK, 1, nx=True, ex=LOCK_SECONDS):
+            try:
+                entry = await _rebuild(client, version, build)
+            except Exception:
+                await client.delete(KEY_LOCK)
+                raise
+            return entry[b"body"], entry[b"etag"].decode()
+
+        # Another request is rebuilding, its result beats another query
+        deadline = time.monotonic() + WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(WAIT_STEP)
+            entry, _ = await _read(client)
+            if entry is not None:
+                return entry[b"body"], entry[b"etag"].decode()
+    except RedisError:
+        logger.warning("reviews cache unavailable", exc_info=True)
+
+    body = await build()
+    return body, body_etag(body)
+
+
+async def invalidate_public_reviews():
+    """Called after anything shown in the feed changed, never fails the write that triggered it."""
+    try:
+        await get_redis().incr(KEY_VERSION)
+    except RedisError:
+        logger.warning("reviews cache not invalidated", exc_info=True)
@@ -1,8 +1,11 @@
 import functools
+import logging
 from fastapi import HTTPException, Request
 import jwt
 from config import settings
 
+logger = logging.getLogger(__name__)
+
 def login_required(func):
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
@@ -27,6 +30,7 @@ def login_required(func):
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
             request.state.user_email = payload.get("sub")
             request.state.user_id = payload.get("id")
+            request.state.user_role = payload.get("role")
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=401, detail="Token expired")
         except jwt.InvalidTokenError:
@@ -63,7 +67,10 @@ def role_required(required_role: str):
                 payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
                 user_role = payload.get("role")
                 if user_role not in required_role:
-                    print( "role by token is:", user_role, " required_role is:", required_role)
+                    logger.info(
+                        "permission denied",
+                        extra={"role": user_role, "required_role": required_role, "sample_rate": settings.LOG_SAMPLE_RATE},
+                    )
                     raise HTTPException(status_code=403, detail="Insufficient permissions")
                 request.state.user_email = payload.get("sub")
             except jwt.ExpiredSignatureError:
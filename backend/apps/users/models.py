@@ -3,6 +3,7 @@ import enum
 import uuid
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     DateTime,
     Enum,
@@ -23,6 +24,7 @@ from sqlalchemy.dialects.postgresql import UUID
 
 import uuid_utils
 from apps.db.base import Base
+from apps.outbox.services import outbox_insert
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from apps.projects.models import Project
@@ -88,6 +90,12 @@ class Users(Base):
 
     website: Mapped[str | None] = mapped_column(String, nullable=True)
 
+    # Storage usage, kept up to date by the project upload/update/delete paths
+    storage_bytes: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0", nullable=False)
+    storage_objects: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # None falls back to settings.STORAGE_QUOTA_BYTES
+    storage_quota_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+
     activations: Mapped["Activations"] = relationship(
         "Activations",
         back_populates="user",
@@ -165,11 +173,18 @@ def create_activation_token(mapper, connection, target):
     if getattr(target, "_skip_activation", False):
         return
 
+    activation_code = str(uuid.uuid4())
     stmt = insert(Activations.__table__).values(
         user_id=target.id,
-        activation_code=str(uuid.uuid4()),
+        activation_code=activation_code,
     )
     connection.execute(stmt)
+    # Same transaction as the user row, the outbox relay hands it to Celery after commit
+    connection.execute(outbox_insert(
+        "apps.send_email.tasks.send_email_task",
+        [target.email, activation_code],
+        dedup_key=f"activation:{target.id}",
+    ))
 
 
 class TokenBlacklist(Base):
@@ -1,5 +1,11 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
+from config import settings
+
 def hash_password(password: str) -> str:
     """Hash a password for registration."""
     # Convert string to bytes
@@ -16,3 +22,43 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         plain_password.encode('utf-8'), 
         hashed_password.encode('utf-8')
     )
+
+
+class HashQueue:
+    """
+    Runs bcrypt on a bounded thread pool so hashing never blocks the event loop.
+    waiting/running are exported as metrics, a growing backlog means login and
+    registration are limited by CPU.
+    """
+
+    def __init__(self, workers: int):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.waiting = 0
+        self.running = 0
+        self._lock = threading.Lock()
+
+    def _run(self, func, *args):
+        with self._lock:
+            self.waiting -= 1
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    async def submit(self, func, *args):
+        with self._lock:
+            self.waiting += 1
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._run, func, *args)
+
+
+hash_queue = HashQueue(settings.PASSWORD_HASH_WORKERS)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hash_queue.submit(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hash_queue.submit(verify_password, plain_password, hashed_password)
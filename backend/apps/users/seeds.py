@@ -1,24 +1,38 @@
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .models import Users, UserRole
-from .security import hash_password
+from .security import hash_password_async
 import os
 
 DEFAULT_ADMIN_EMAIL = os.getenv("DEFAULT_ADMIN_EMAIL")
 DEFAULT_ADMIN_PASSWORD = os.getenv("DEFAULT_ADMIN_PASSWORD")
 
+# Any constant bigint, shared by every API worker
+ADMIN_SEED_LOCK_ID = 7_204_118_203
+
 
 async def create_default_admin(db: AsyncSession):
+    """
+    Every worker calls this on startup. The transaction scoped advisory lock lets
+    exactly one of them seed, the others skip instead of racing on the insert.
+    """
+    if not DEFAULT_ADMIN_EMAIL or not DEFAULT_ADMIN_PASSWORD:
+        return
+    locked = await db.scalar(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": ADMIN_SEED_LOCK_ID})
+    if not locked:
+        return
+
     admin = await db.scalar(
-        select(Users).where(Users.email == DEFAULT_ADMIN_EMAIL)
+        select(Users.id).where(Users.email == DEFAULT_ADMIN_EMAIL)
     )
     if admin:
+        await db.rollback()
         return
 
     admin_user = Users(
         email=DEFAULT_ADMIN_EMAIL,
-        password=hash_password(DEFAULT_ADMIN_PASSWORD),
+        password=await hash_password_async(DEFAULT_ADMIN_PASSWORD),
         role=UserRole.ADMIN,
         is_active=True,
     )
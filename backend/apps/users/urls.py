@@ -35,9 +35,10 @@ async def login_user(
 @login_required
 async def get_users(
     request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db)
 ):
-    return await views.get_users_view(db, request)
+    return await views.get_users_view(db, request, response)
 
 @router.get("/refresh")
 async def refresh_token(
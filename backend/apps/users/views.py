@@ -1,20 +1,28 @@
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, Response, Request
-from sqlalchemy import select, delete, update, or_
+from sqlalchemy import select, delete, update, or_, func
 from sqlalchemy.orm import selectinload
 from .models import Users, TokenBlacklist, Invitation, UserRole, Activations, UserReview, Activity
-from .schemas import UserCreate, UserLogin, InvitationCreate, UserProfileResponse, UserReviewBody, UserUpdate
+from .schemas import UserCreate, UserLogin, InvitationCreate, UserProfileResponse, UserReviewBody, UserReviewResponse, UserUpdate
 from datetime import datetime, timedelta, timezone
 import os
 from fastapi.responses import RedirectResponse
 import jwt
 from config import settings
-from apps.users.security import hash_password, verify_password
+from apps.users.security import hash_password_async, verify_password_async
 import uuid
 import secrets
-from apps.send_email.tasks import send_email_task
+from apps.outbox.services import enqueue
 from apps.users.dependency import get_current_user
+from apps.users.cache import get_public_reviews, invalidate_public_reviews
+from apps.http.conditional import is_conditional, not_modified, validator_headers, version_etag
+from database import AsyncSessionLocal
+from pydantic import TypeAdapter
+
+reviews_adapter = TypeAdapter(list[UserReviewResponse])
+# Fields of a user shown next to their reviews in the public feed
+REVIEWER_FIELDS = {"full_name", "linkedin", "github", "twitter", "website"}
 
 
 def create_access_token(
@@ -82,27 +90,40 @@ async def create_user_view(user: UserCreate, db: AsyncSession, invitation_token:
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     if invitation_token:
-        db_user = Users(email=user.email, password=hash_password(user.password), role=assigned_role, invited_by=invitation.creator_id, is_active=True)
+        db_user = Users(email=user.email, password=await hash_password_async(user.password), role=assigned_role, invited_by=invitation.creator_id, is_active=True)
         db_user._skip_activation = True  # Custom attribute to skip activation email
     else:
-        db_user = Users(email=user.email, password=hash_password(user.password))
+        db_user = Users(email=user.email, password=await hash_password_async(user.password))
         db_user._skip_activation = False  # Custom attribute to indicate activation email should be sent
     db.add(db_user)
     if invitation_token:
         await db.delete(invitation)
+    # The activation email is queued in the outbox by the Users after_insert listener
     await db.commit()
     await db.refresh(db_user)
-    # get actiavtein token from Activations
-    get_activation_token=await db.execute(select(Activations).where(Activations.user_id==db_user.id))
-    activation_token=get_activation_token.scalar_one_or_none()
-    if activation_token and not getattr(db_user, "_skip_activation", False):
-        send_email_task.delay(db_user.email, activation_token.activation_code)
-        
     return db_user
 
-async def get_users_view(db: AsyncSession, request: Request):
+def _profile_etag(user_id, last_modified) -> str:
+    return version_etag("profile", user_id, last_modified)
+
+
+async def get_users_view(db: AsyncSession, request: Request, response: Response):
 
     user_email = request.state.user_email
+    if is_conditional(request):
+        # Only the validators are read, the profile is loaded when it changed
+        try:
+            row = (await db.execute(
+                select(Users.id, func.coalesce(Users.updated_at, Users.created_at)).where(Users.email == user_email)
+            )).one_or_none()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Database error")
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+        etag = _profile_etag(*row)
+        if not_modified(request, etag, row[1]):
+            return Response(status_code=304, headers=validator_headers(etag, row[1], "private, no-cache"))
+
     try:
         result = await db.execute(select(Users).where(Users.email == user_email))
         db_user = result.scalar_one_or_none()
@@ -110,6 +131,8 @@ async def get_users_view(db: AsyncSession, request: Request):
         raise HTTPException(status_code=500, detail="Database error")
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
+    last_modified = db_user.updated_at or db_user.created_at
+    response.headers.update(validator_headers(_profile_etag(db_user.id, last_modified), last_modified, "private, no-cache"))
     return db_user
 
 async def create_user_review_view(db: AsyncSession, request: Request, body: UserReviewBody):
@@ -127,14 +150,14 @@ async def create_user_review_view(db: AsyncSession, request: Request, body: User
     db.add(log)
     await db.commit()
     await db.refresh(review)
+    if review.consent:
+        await invalidate_public_reviews()
     return {
         "reviewer": request.state.user_email,
         "review": review.review,
         "consent": review.consent,
     }
-async def get_user_reviews_view(db: AsyncSession, request: Request):
-    user_id = getattr(request.state, "user_id", None)
-
+def reviews_query(user_id=None):
     # Base query: always join users (we always return reviewer info)
     stmt = (
         select(UserReview, Users)
@@ -156,27 +179,48 @@ async def get_user_reviews_view(db: AsyncSession, request: Request):
             UserReview.consent == True
         )
 
-    stmt = stmt.order_by(UserReview.id.desc())
+    return stmt.order_by(UserReview.id.desc())
 
-    result = await db.execute(stmt)
+
+async def build_public_reviews() -> bytes:
+    """The anonymous feed as JSON, on its own session since it may run after the request ended."""
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(reviews_query())).all()
+    return reviews_adapter.dump_json(reviews_adapter.validate_python([review_to_dict(review, user) for review, user in rows]))
+
+
+async def get_user_reviews_view(db: AsyncSession, request: Request):
+    user_id = getattr(request.state, "user_id", None)
+
+    if not user_id:
+        # Same for every anonymous visitor, served from the shared cache
+        body, etag = await get_public_reviews(build_public_reviews)
+        headers = validator_headers(etag)
+        if not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    result = await db.execute(reviews_query(user_id))
     rows = result.all()
 
-    return [
-        {
-            "review_id": review.id,
-            "review": review.review,
-            "consent": review.consent,
-            "reviewer": {
-                "id": str(user.id),
-                "full_name": user.full_name,
-                "linkedin": user.linkedin,
-                "github": user.github,
-                "twitter": user.twitter,
-                "website": user.website,
-            },
-        }
-        for review, user in rows
-    ]
+    return [review_to_dict(review, user) for review, user in rows]
+
+
+def review_to_dict(review: UserReview, user: Users) -> dict:
+    return {
+        "review_id": review.id,
+        "review": review.review,
+        "consent": review.consent,
+        "reviewer": {
+            "id": str(user.id),
+            "full_name": user.full_name,
+            "linkedin": user.linkedin,
+            "github": user.github,
+            "twitter": user.twitter,
+            "website": user.website,
+        },
+    }
+
 
 async def delete_user_review_view(
     review_id: int,
@@ -213,6 +257,8 @@ async def delete_user_review_view(
     db.add(log)
     await db.delete(review)
     await db.commit()
+    if review.consent:
+        await invalidate_public_reviews()
 
     return {"detail": "Review deleted successfully"}
 
@@ -221,7 +267,7 @@ async def login_user_view(user: UserLogin, response: Response, db: AsyncSession)
     db_user = result.scalar_one_or_none()
     if not db_user.is_active:
         raise HTTPException(status_code=400, detail="User is not active, Please check your email to activate your account")
-    if db_user and verify_password(user.password, db_user.password):
+    if db_user and await verify_password_async(user.password, db_user.password):
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
             subject=db_user.email, user_id=str(db_user.id), role=db_user.role, expires_delta=access_token_expires
@@ -375,10 +421,14 @@ async def invite_user_view(body: InvitationCreate, db: AsyncSession, request: Re
         expires_at=datetime.now(timezone.utc) + timedelta(days=7),
     )
     db.add(new_invite)
-    await db.commit()
-    # TODO: Send invitation email with the token link
     verification_link= f"{request.url.scheme}://{request.url.hostname}:{request.url.port}/register?invitation_token={token}"
-    print(f"Invitation Link is : {verification_link}")
+    await enqueue(
+        db,
+        "apps.send_email.tasks.send_template_email_task",
+        [body.email, "invitation", {"link": verification_link, "role": body.role}],
+        dedup_key=f"invitation:{token}",
+    )
+    await db.commit()
 
     return {"message": "Invitation sent successfully"}
 
@@ -434,6 +484,8 @@ async def update_user_view(
     except Exception:
         await db.rollback()
         raise HTTPException(status_code=500, detail="Database update failed")
+    if REVIEWER_FIELDS & update_data.keys():
+        await invalidate_public_reviews()
 
     return db_user
 
@@ -0,0 +1,31 @@
+"""Versioned baseline files shared by the benchmark scripts, stored in benchmarks/baselines/."""
+import json
+import os
+import subprocess
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+BASELINE_VERSION = 1
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save(kind: str, result: dict) -> str:
+    """Writes result as {kind}-{commit}.json and returns the path."""
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f"{kind}-{result['commit']}.json")
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    return path
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        raise SystemExit(f"Baseline version {baseline.get('version')} is not {BASELINE_VERSION}, record a new one")
+    return baseline
@@ -0,0 +1,124 @@
+"""
+CPU cost against bytes saved of gzip and brotli at several levels, on payloads
+shaped like the responses of /users/review, /users/admin/users and
+/users/admin/activity.
+
+Run from the backend directory:
+    python -m benchmarks.compression --rows 1000
+    python -m benchmarks.compression --rows 100 --rows 5000 --stream-chunk 16384
+
+--stream-chunk also measures the streaming encoders of CompressionMiddleware,
+which flush after every chunk and so compress worse than one-shot calls.
+"""
+import argparse
+import gzip
+import json
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import brotli
+
+from apps.http.compression import BrotliEncoder, GzipEncoder
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+
+
+def reviews_payload(rows: int) -> bytes:
+    return json.dumps([
+        {
+            "review_id": n,
+            "review": f"Deployed my portfolio in minutes, review number {n}. The upload flow just works.",
+            "consent": True,
+            "reviewer": {
+                "id": str(uuid.uuid4()),
+                "full_name": f"User {n}",
+                "linkedin": f"https://linkedin.com/in/user{n}",
+                "github": f"https://github.com/user{n}",
+                "twitter": None,
+                "website": f"https://user{n}.example.com",
+            },
+        }
+        for n in range(rows)
+    ]).encode()
+
+
+def admin_users_payload(rows: int) -> bytes:
+    return json.dumps([
+        {
+            "user_id": str(uuid.uuid4()),
+            "full_name": f"User {n}",
+            "email": f"user{n}@example.com",
+            "project_count": n % 4,
+            "projects": [{"id": n * 10 + i, "title": f"site-{n}-{i}"} for i in range(n % 4)],
+        }
+        for n in range(rows)
+    ]).encode()
+
+
+def activity_payload(rows: int) -> bytes:
+    now = datetime.now(timezone.utc)
+    actions = ("USER_UPDATE", "NEW PROJECT CREATED:site-{n}", "USER_REVIEW_ADDED, Review is: Great {n}")
+    return json.dumps([
+        {
+            "activity_id": n,
+            "timestamp": (now - timedelta(minutes=n)).isoformat(),
+            "user_email": f"user{n % 200}@example.com",
+            "user_full_name": f"User {n % 200}",
+            "task": actions[n % 3].format(n=n),
+        }
+        for n in range(rows)
+    ]).encode()
+
+
+PAYLOADS = {
+    "/users/review": reviews_payload,
+    "/users/admin/users": admin_users_payload,
+    "/users/admin/activity": activity_payload,
+}
+
+
+def encoders(stream_chunk: int | None):
+    for level in GZIP_LEVELS:
+        yield f"gzip-{level}", lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0)
+    for quality in BROTLI_QUALITIES:
+        yield f"br-{quality}", lambda body, quality=quality: brotli.compress(body, quality=quality)
+    if stream_chunk:
+        for name, make in (("gzip-6", lambda: GzipEncoder(6)), ("br-4", lambda: BrotliEncoder(4))):
+            def streamed(body, make=make):
+                encoder = make()
+                parts = [encoder.compress(body[i:i + stream_chunk]) for i in range(0, len(body), stream_chunk)]
+                return b"".join(parts) + encoder.finish()
+            yield f"{name} stream", streamed
+
+
+def measure(func, repeat: int = 5) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, action="append", help="rows per payload (repeatable)")
+    parser.add_argument("--stream-chunk", type=int, help="chunk size for the streaming encoders")
+    args = parser.parse_args()
+
+    print(f"{'payload':<24} {'rows':>6} {'encoder':<16} {'bytes':>10} {'ratio':>6} {'ms':>8} {'MB/s':>8} {'KB saved/ms':>12}")
+    for rows in args.rows or [100, 1000]:
+        for route, build in PAYLOADS.items():
+            body = build(rows)
+            print(f"{route:<24} {rows:>6} {'identity':<16} {len(body):>10}")
+            for name, encode in encoders(args.stream_chunk):
+                size = len(encode(body))
+                seconds = measure(lambda: encode(body))
+                saved_per_ms = (len(body) - size) / 1024 / (seconds * 1000)
+                print(
+                    f"{'':<24} {'':>6} {name:<16} {size:>10} {len(body) / size:>6.1f} "
+                    f"{seconds * 1000:>8.3f} {len(body) / seconds / 1e6:>8.1f} {saved_per_ms:>12.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Render throughput of the email template registry against building each message
+with email.mime and an inline f-string, as send_email_task used to.
+
+Run from the backend directory:
+    python -m benchmarks.email_render --messages 20000
+"""
+import argparse
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from apps.send_email.messages import SENDER, env, render_email
+
+
+def render_inline(email: str, token: str) -> str:
+    msg = MIMEMultipart("alternative")
+    activation_link = f"{env.globals['base_url']}/activate?user_email={email}&activation_token={token}"
+    msg["Subject"] = "Activate Your Account"
+    msg["From"] = SENDER
+    msg["To"] = email
+    msg.attach(MIMEText("Hello! Please activate your account by clicking Below.", "plain"))
+    msg.attach(MIMEText(f'<html><body><a href="{activation_link}">Activate Account</a></body></html>', "html"))
+    return msg.as_string()
+
+
+def render_registry(email: str, token: str) -> str:
+    return render_email(email, "activation", {"token": token})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=10000)
+    args = parser.parse_args()
+
+    recipients = [(f"user{i}@example.com", f"token-{i}") for i in range(args.messages)]
+    for label, render in (("email.mime per message", render_inline), ("template registry", render_registry)):
+        started = time.perf_counter()
+        for email, token in recipients:
+            render(email, token)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<24} {args.messages / elapsed:10.1f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
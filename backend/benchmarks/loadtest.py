@@ -0,0 +1,217 @@
+"""
+End-to-end load test of the user and project flows:
+register -> activate -> login -> refresh -> info -> review -> upload -> site -> delete
+
+Every virtual user runs the whole flow with its own cookie jar. Activation codes
+are read from the database, since no email is delivered. The app runs in-process
+by default, with STORAGE_BACKEND=local and an in-memory Celery broker. --target
+points the harness at a running server instead, which must share DATABASE_URL.
+A local Postgres with migrations applied is required either way.
+
+Run from the backend directory:
+    python -m benchmarks.loadtest --users 200 --concurrency 20 --save
+    python -m benchmarks.loadtest --users 200 --concurrency 20 --compare benchmarks/baselines/<file>.json
+
+--save writes throughput and p50/p95/p99 per route to benchmarks/baselines/,
+named after the current commit. --compare exits with status 1 when a route's
+p95 grew, or its throughput dropped, by more than --threshold.
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+import uuid
+import zipfile
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks import baseline
+
+STEPS = ("register", "activate", "login", "refresh", "info", "review", "upload", "site", "delete")
+
+
+class StepFailed(Exception):
+    pass
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, step: str, request):
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError as e:
+            self.errors[step] += 1
+            raise StepFailed(f"{step}: {e}")
+        self.latencies[step].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[step] += 1
+            raise StepFailed(f"{step}: {response.status_code} {response.text[:200]}")
+        return response
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+def site_archive() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("site/index.html", "<html><body>load test</body></html>")
+        archive.writestr("site/app.js", "console.log('load test');\n" * 200)
+        archive.writestr("site/style.css", "body { margin: 0; }\n" * 200)
+    return buffer.getvalue()
+
+
+async def activation_code(email: str) -> str:
+    from sqlalchemy import select
+    from database import AsyncSessionLocal
+    from apps.users.models import Activations, Users
+
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(
+            select(Activations.activation_code).join(Users, Users.id == Activations.user_id).where(Users.email == email)
+        )
+
+
+async def user_flow(client_factory, recorder: Recorder, run_id: str, n: int, archive: bytes):
+    email = f"load-{run_id}-{n}@example.com"
+    password = "load-test-password"
+    async with client_factory() as client:
+        await recorder.call("register", client.post("/api/v1/users/register", json={"email": email, "password": password}))
+        code = await activation_code(email)
+        await recorder.call("activate", client.post(f"/api/v1/users/activate/{email}/{code}"))
+        await recorder.call("login", client.post("/api/v1/users/login", json={"email": email, "password": password}))
+        await recorder.call("refresh", client.get("/api/v1/users/refresh"))
+        await recorder.call("info", client.get("/api/v1/users/info"))
+        await recorder.call("review", client.post("/api/v1/users/review", json={"review": f"Load test {n}", "consent": True}))
+        response = await recorder.call("upload", client.post(
+            "/api/v1/projects/upload",
+            data={"name": f"load-{run_id}-{n}"},
+            files={"file": ("site.zip", archive, "application/zip")},
+        ))
+        project_id = response.json()["project_id"]
+        # First read of a fresh project, goes through the site cache miss path to storage
+        response = await recorder.call("site", client.get(f"/api/v1/projects/site/load-{run_id}-{n}/"))
+        if b"load test" not in response.content:
+            recorder.errors["site"] += 1
+            raise StepFailed(f"site: unexpected body {response.content[:200]!r}")
+        await recorder.call("delete", client.delete(f"/api/v1/projects/delete/{project_id}"))
+
+
+async def run(args) -> dict:
+    if args.target:
+        def client_factory():
+            return httpx.AsyncClient(base_url=args.target, timeout=60)
+    else:
+        os.environ.setdefault("STORAGE_BACKEND", "local")
+        from main import app, celery_app
+        # Tasks only need to be accepted, nothing consumes them during the run
+        celery_app.conf.broker_url = "memory://"
+        celery_app.conf.result_backend = "cache+memory://"
+        transport = httpx.ASGITransport(app=app)
+
+        def client_factory():
+            return httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=60)
+
+    recorder = Recorder()
+    archive = site_archive()
+    run_id = uuid.uuid4().hex[:8]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    failures = []
+
+    async def one(n: int):
+        async with semaphore:
+            try:
+                await user_flow(client_factory, recorder, run_id, n, archive)
+            except StepFailed as e:
+                failures.append(str(e))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(args.users)))
+    elapsed = time.perf_counter() - started
+
+    for failure in failures[:5]:
+        print(f"failed: {failure}", file=sys.stderr)
+
+    routes = {}
+    for step in STEPS:
+        latencies = recorder.latencies[step]
+        if not latencies:
+            continue
+        routes[step] = {
+            "count": len(latencies),
+            "errors": recorder.errors[step],
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        }
+    return {
+        "version": baseline.BASELINE_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": baseline.git_commit(),
+        "config": {"users": args.users, "concurrency": args.concurrency, "target": args.target or "in-process"},
+        "elapsed_seconds": round(elapsed, 2),
+        "flows_failed": len(failures),
+        "routes": routes,
+    }
+
+
+def print_report(result: dict):
+    print(f"{'route':<10} {'count':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for step, r in result["routes"].items():
+        print(f"{step:<10} {r['count']:>6} {r['errors']:>6} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}")
+    print(f"{result['elapsed_seconds']}s, {result['flows_failed']} failed flows")
+
+
+def compare(result: dict, previous: dict, threshold: float) -> list[str]:
+    regressions = []
+    for step, old in previous["routes"].items():
+        new = result["routes"].get(step)
+        if new is None:
+            regressions.append(f"{step}: missing from this run")
+            continue
+        if new["p95_ms"] > old["p95_ms"] * (1 + threshold):
+            regressions.append(f"{step}: p95 {old['p95_ms']}ms -> {new['p95_ms']}ms")
+        if new["rps"] < old["rps"] * (1 - threshold):
+            regressions.append(f"{step}: throughput {old['rps']} -> {new['rps']} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50, help="virtual users, each runs the full flow once")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--target", help="base URL of a running server, in-process when omitted")
+    parser.add_argument("--save", action="store_true", help="write the result to benchmarks/baselines/")
+    parser.add_argument("--compare", help="baseline file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print_report(result)
+
+    if args.save:
+        print(f"baseline written to {baseline.save('loadtest', result)}")
+
+    if args.compare:
+        regressions = compare(result, baseline.load(args.compare), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions beyond threshold")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Micro-benchmarks of functions on the hot request paths: JWT creation and decoding,
+password hashing, find_index_root, ZIP validation and extraction, response model
+serialization and the row-to-dict helpers of the list views.
+
+Run from the backend directory:
+    python -m benchmarks.micro --save
+    python -m benchmarks.micro --compare benchmarks/baselines/<file>.json
+    python -m benchmarks.micro --only jwt
+
+Each benchmark reports the best per-call time over --repeat runs, which is the
+least noisy figure on a shared machine. --compare exits with status 1 when a
+benchmark got slower by more than --threshold.
+"""
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from pydantic import TypeAdapter
+
+from config import settings
+from benchmarks import baseline
+from apps.projects.models import Project, ProjectStatus
+from apps.projects.services.archive import validate_zip
+from apps.projects.services.deploy import find_index_root
+from apps.projects.views import project_summary
+from apps.users.models import UserReview, Users
+from apps.users.schemas import UserProfileResponse, UserReviewResponse
+from apps.users.security import hash_password, verify_password
+from apps.users.views import create_access_token, create_refresh_token, review_to_dict
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+# Each setup returns (function to time, cleanup or None)
+
+@benchmark("jwt.create_access_token")
+def _():
+    return lambda: create_access_token("user@example.com", str(uuid.uuid4()), "user", timedelta(minutes=30)), None
+
+
+@benchmark("jwt.create_refresh_token")
+def _():
+    return lambda: create_refresh_token("user@example.com", str(uuid.uuid4()), "user", timedelta(days=7)), None
+
+
+@benchmark("jwt.decode")
+def _():
+    token = create_access_token("user@example.com", str(uuid.uuid4()), "user", timedelta(minutes=30))
+    return lambda: jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]), None
+
+
+@benchmark("password.hash")
+def _():
+    return lambda: hash_password("correct horse battery staple"), None
+
+
+@benchmark("password.verify")
+def _():
+    hashed = hash_password("correct horse battery staple")
+    return lambda: verify_password("correct horse battery staple", hashed), None
+
+
+@benchmark("deploy.find_index_root")
+def _():
+    # 2000 files across 200 directories, index.html near the end of the walk
+    root = tempfile.mkdtemp()
+    for d in range(200):
+        directory = os.path.join(root, "site", f"dir_{d:03d}")
+        os.makedirs(directory)
+        for f in range(10):
+            open(os.path.join(directory, f"file_{f}.js"), "w").close()
+    open(os.path.join(root, "site", "index.html"), "w").close()
+    return lambda: find_index_root(root), lambda: shutil.rmtree(root)
+
+
+def _site_zip(files: int, size: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("site/index.html", "<html></html>")
+        payload = os.urandom(size // 2).hex()[:size]
+        for i in range(files):
+            archive.writestr(f"site/assets/file_{i}.js", payload)
+    return buffer.getvalue()
+
+
+@benchmark("archive.validate_zip")
+def _():
+    data = _site_zip(500, 4096)
+    return lambda: validate_zip(io.BytesIO(data)), None
+
+
+@benchmark("archive.extract")
+def _():
+    data = _site_zip(500, 4096)
+    target = tempfile.mkdtemp()
+
+    def extract():
+        archive = validate_zip(io.BytesIO(data))
+        with zipfile.ZipFile(io.BytesIO(data)) as zip_ref:
+            for info in archive.entries:
+                zip_ref.extract(info, target)
+
+    return extract, lambda: shutil.rmtree(target)
+
+
+def _user(n: int) -> Users:
+    return Users(
+        id=uuid.uuid4(), email=f"user{n}@example.com", full_name=f"User {n}", role="user", is_active=True,
+        created_at=datetime.now(timezone.utc), updated_at=None, location="Earth",
+        linkedin="https://linkedin.com/in/u", github="https://github.com/u", twitter=None, website=None,
+    )
+
+
+@benchmark("schema.UserProfileResponse")
+def _():
+    user = _user(0)
+    adapter = TypeAdapter(UserProfileResponse)
+    return lambda: adapter.dump_json(UserProfileResponse.model_validate(user, from_attributes=True)), None
+
+
+@benchmark("schema.UserReviewResponse x100")
+def _():
+    rows = [review_to_dict(UserReview(id=n, review=f"Review {n}", consent=True), _user(n)) for n in range(100)]
+    adapter = TypeAdapter(list[UserReviewResponse])
+    return lambda: adapter.dump_json(adapter.validate_python(rows)), None
+
+
+@benchmark("views.review_to_dict x100")
+def _():
+    rows = [(UserReview(id=n, review=f"Review {n}", consent=True), _user(n)) for n in range(100)]
+    return lambda: [review_to_dict(review, user) for review, user in rows], None
+
+
+@benchmark("views.project_summary x100")
+def _():
+    projects = [
+        Project(id=n, name=f"site-{n}", status=ProjectStatus.ACTIVE, size_bytes=1024 * n, object_count=n,
+                created_at=datetime.now(timezone.utc))
+        for n in range(100)
+    ]
+    return lambda: [project_summary(p) for p in projects], None
+
+
+def measure(func, repeat: int) -> float:
+    """Best seconds per call over repeat runs, each long enough to be measurable."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="run benchmarks whose name contains this")
+    parser.add_argument("--save", action="store_true", help="write the result to benchmarks/baselines/")
+    parser.add_argument("--compare", help="baseline file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative slowdown, 0.15 = 15%%")
+    args = parser.parse_args()
+
+    timings = {}
+    for name, setup in BENCHMARKS.items():
+        if args.only and args.only not in name:
+            continue
+        func, cleanup = setup()
+        try:
+            timings[name] = round(measure(func, args.repeat) * 1e6, 3)
+        finally:
+            if cleanup:
+                cleanup()
+        print(f"{name:<34} {timings[name]:>12.3f} us/call")
+
+    result = {
+        "version": baseline.BASELINE_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": baseline.git_commit(),
+        "python": sys.version.split()[0],
+        "benchmarks": timings,
+    }
+    if args.save:
+        print(f"baseline written to {baseline.save('micro', result)}")
+
+    if args.compare:
+        previous = baseline.load(args.compare)["benchmarks"]
+        regressions = [
+            f"{name}: {previous[name]} -> {us} us/call"
+            for name, us in timings.items()
+            if name in previous and us > previous[name] * (1 + args.threshold)
+        ]
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions beyond threshold")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Messages/sec of a new SMTP session per email versus the async SMTP pool of the email worker,
+against a local aiosmtpd server (pip install aiosmtpd). --latency delays every DATA reply
+to show what concurrency buys against a slow server.
+
+Run from the backend directory:
+    python -m benchmarks.smtp_throughput --messages 500 --concurrency 1 --concurrency 100 --latency 0.05
+"""
+import argparse
+import asyncio
+import smtplib
+import time
+from email.mime.text import MIMEText
+
+from aiosmtpd.controller import Controller
+
+from apps.send_email.pool import SMTPConnectionPool
+
+
+class CountingHandler:
+    def __init__(self, latency: float = 0.0):
+        self.received = 0
+        self.latency = latency
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.received += 1
+        return "250 OK"
+
+
+def build_message(i: int) -> str:
+    msg = MIMEText(f"Benchmark message {i}")
+    msg["Subject"] = "Benchmark"
+    msg["From"] = "noreply@example.com"
+    msg["To"] = f"user{i}@example.com"
+    return msg.as_string()
+
+
+def send_unpooled(host: str, port: int, messages: list[str]):
+    for i, msg in enumerate(messages):
+        with smtplib.SMTP(host, port) as server:
+            server.sendmail("noreply@example.com", [f"user{i}@example.com"], msg)
+
+
+async def send_pooled(pool: SMTPConnectionPool, messages: list[str]):
+    results = await pool.sendmail_many(
+        [("noreply@example.com", [f"user{i}@example.com"], msg) for i, msg in enumerate(messages)]
+    )
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        raise errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, action="append", help="in-flight limit of the pool (repeatable)")
+    parser.add_argument("--max-per-connection", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the server waits before accepting DATA")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    handler = CountingHandler(args.latency)
+    controller = Controller(handler, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    messages = [build_message(i) for i in range(args.messages)]
+    runs = [("connection per message", lambda: send_unpooled("127.0.0.1", args.port, messages))]
+    for concurrency in args.concurrency or [1, 50]:
+        # The stand-in speaks plain SMTP, so STARTTLS and login are skipped
+        pool = SMTPConnectionPool(
+            "127.0.0.1", args.port, starttls=False,
+            max_in_flight=concurrency, max_messages=args.max_per_connection,
+        )
+
+        async def pooled(pool=pool):
+            try:
+                await send_pooled(pool, messages)
+            finally:
+                await pool.close()
+
+        runs.append((f"async pool x{concurrency}", lambda pooled=pooled: asyncio.run(pooled())))
+    try:
+        for label, send in runs:
+            before = handler.received
+            started = time.perf_counter()
+            send()
+            elapsed = time.perf_counter() - started
+            assert handler.received - before == len(messages)
+            print(f"{label:<24} {len(messages) / elapsed:9.1f} msg/s ({elapsed:.2f}s)")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
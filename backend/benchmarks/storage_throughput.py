@@ -0,0 +1,68 @@
+"""
+Upload/delete throughput of the storage backends.
+
+Run from the backend directory:
+    python -m benchmarks.storage_throughput --backend local --backend memory --files 500 --size 16384
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from apps.projects.services.storage import get_storage
+
+
+def make_site(directory: str, files: int, size: int) -> list[str]:
+    paths = []
+    for i in range(files):
+        path = os.path.join(directory, f"assets/file_{i}.bin")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+async def run(backend: str, paths: list[str], size: int, rounds: int):
+    store = get_storage(backend)
+    prefix = "projects/benchmark/"
+    items = [(path, f"{prefix}{os.path.basename(path)}") for path in paths]
+    total_mb = len(paths) * size / (1024 * 1024)
+
+    for i in range(rounds):
+        started = time.perf_counter()
+        await store.add_many(items)
+        upload = time.perf_counter() - started
+
+        started = time.perf_counter()
+        deleted = await store.delete_prefix(prefix)
+        delete = time.perf_counter() - started
+
+        print(
+            f"{backend:<8} round {i + 1}: "
+            f"upload {len(items) / upload:9.1f} obj/s {total_mb / upload:8.2f} MB/s | "
+            f"delete {deleted / delete:9.1f} obj/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", action="append", help="s3, local or memory (repeatable)")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size", type=int, default=16 * 1024, help="bytes per file")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        paths = make_site(directory, args.files, args.size)
+        for backend in args.backend or ["memory", "local"]:
+            asyncio.run(run(backend, paths, args.size, args.rounds))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
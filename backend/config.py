@@ -9,9 +9,114 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Threads running bcrypt for login and registration
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Connections opened per API worker at startup, at most the engine's pool size
+    STARTUP_WARM_CONNECTIONS: int = 5
+
+    # Logging, "json" for production or "text" for local development
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    # Fraction of high-volume records kept (successful requests, permission denials)
+    LOG_SAMPLE_RATE: float = 0.1
+
+    # Response compression, smaller complete bodies are sent as they are
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # OpenTelemetry tracing, spans go to a JSON lines file (or the console) when enabled
+    TRACING_ENABLED: bool = False
+    TRACING_SERVICE_NAME: str = "backend"
+    TRACING_EXPORTER: str = "file"
+    TRACING_FILE: str = "/tmp/traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 1.0
+
+    # pyinstrument profiles, requested by admins with "X-Profile: 1" or sampled from all requests
+    PROFILING_INTERVAL: float = 0.001
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_SAMPLED_INTERVAL: float = 0.01
+    PROFILING_MAX_STORED: int = 200
+    PROFILING_TTL: int = 60 * 60 * 24
+
+    # Shared cache of the anonymous reviews feed, served stale while one request refreshes it
+    REVIEWS_CACHE_TTL_SECONDS: int = 30
+    REVIEWS_CACHE_STALE_SECONDS: int = 300
+
+    # Storage backend for hosted project files: "s3", "local" or "memory"
+    STORAGE_BACKEND: str = "s3"
+    STORAGE_BUCKET: str = "aws-manas-generic-sites"
+    STORAGE_REGION: str = "us-east-1"
+    # Set to use an S3 compatible server such as MinIO instead of AWS
+    STORAGE_ENDPOINT_URL: str | None = None
+    STORAGE_LOCAL_ROOT: str = "/tmp/provider-storage"
+    # Max parallel uploads/deletes issued by add_many and delete_prefix
+    STORAGE_CONCURRENCY: int = 8
+    STORAGE_STREAM_CHUNK_SIZE: int = 64 * 1024
+    # Retries for keys a batch delete reports as failed
+    STORAGE_DELETE_RETRIES: int = 3
+
+    # Host name hosted sites are served from, e.g. "usersites.example.net". When set, sites answer
+    # only on it and it answers nothing else, so uploaded scripts never share an origin with the API.
+    # Use a separate registrable domain, SameSite counts sibling subdomains as the same site.
+    SITES_HOST: str | None = None
+
+    # In-process LRU used when serving hosted sites
+    SITE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Objects above this size are streamed from storage instead of cached
+    SITE_CACHE_MAX_OBJECT_BYTES: int = 1024 * 1024
+    # Bounds staleness in other workers, invalidation only reaches the local process
+    SITE_CACHE_TTL_SECONDS: int = 60
+
+    # Default per-user storage quota, Users.storage_quota_bytes overrides the byte limit
+    STORAGE_QUOTA_BYTES: int = 500 * 1024 * 1024
+    STORAGE_QUOTA_OBJECTS: int = 50000
+    # Projects changed more recently than this may still be publishing, the usage
+    # reconciliation leaves them and their owners alone until a later run
+    USAGE_RECONCILE_SETTLE_SECONDS: int = 3600
+
+    # Largest single index.html, it is read into memory whole
+    MAX_FILE_SIZE: int = 20 * 1024 * 1024
+
+    # Resumable chunked uploads, S3 requires every part but the last to be >= 5MB
+    UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024
+    UPLOAD_MIN_CHUNK_SIZE: int = 5 * 1024 * 1024
+    UPLOAD_MAX_CHUNK_SIZE: int = 64 * 1024 * 1024
+    UPLOAD_MAX_SIZE: int = 1024 * 1024 * 1024
+    UPLOAD_SESSION_TTL_SECONDS: int = 24 * 3600
+    # Lifetime of pre-signed direct upload URLs
+    DIRECT_UPLOAD_URL_TTL_SECONDS: int = 15 * 60
+
+    # Limits checked against the ZIP central directory before extraction
+    ZIP_MAX_ENTRIES: int = 10000
+    ZIP_MAX_ENTRY_BYTES: int = 50 * 1024 * 1024
+    ZIP_MAX_TOTAL_BYTES: int = 200 * 1024 * 1024
+    ZIP_MAX_COMPRESSION_RATIO: int = 100
+
+    # Pooled SMTP sessions of the email worker, SMTP_SERVER and credentials are read in apps/send_email
+    SMTP_STARTTLS: bool = True
+    # Concurrent sends per worker process, each in-flight message holds its own connection
+    EMAIL_MAX_IN_FLIGHT: int = 100
+    # Upper bound for one message including waiting on a slow server
+    EMAIL_SEND_TIMEOUT: int = 60
+    # Providers commonly cap messages per session, the connection is reopened after this many
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_MAX_IDLE_SECONDS: int = 60
+    SMTP_TIMEOUT: int = 30
+    # Recipients per send_bulk_email_task, larger sends are split across workers
+    EMAIL_BULK_BATCH_SIZE: int = 200
+
+    # Outbox relay (apps/outbox/relay.py)
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_RETRY_BASE_SECONDS: int = 5
+    OUTBOX_RETENTION_DAYS: int = 7
+
     # Configuration for loading from a .env file
     model_config = SettingsConfigDict(
-        env_file=".env", 
+        env_file=".env",
         env_file_encoding="utf-8",
         extra="ignore"  # Ignore extra variables in .env that aren't defined here
     )
@@ -1,14 +1,89 @@
+import time
+
+# Taken before the heavy imports below, reported as the import phase of startup
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from celery import Celery
+from kombu import Queue
 from celery.schedules import crontab
 from urls import root_router
 import os
 import jwt
 from apps.users.seeds import create_default_admin
-from apps.db.session import async_session
+from apps.db.session import async_session, warm_pool
 from fastapi.middleware.cors import CORSMiddleware
-app = FastAPI()
+from database import engine
+from apps.db.session import engine as session_engine
+from apps.metrics.collectors import DatabasePoolCollector
+from apps.metrics.middleware import MetricsMiddleware
+from apps.http.compression import CompressionMiddleware
+from apps.http.sites import SiteIsolationMiddleware
+from apps.logs.handlers import configure_logging
+from apps.logs.middleware import RequestLogMiddleware
+from apps.metrics.registry import app_startup_seconds, registry
+from apps.projects.services.storage import storage
+from config import settings
+from apps.profiling.middleware import ProfilingMiddleware
+from apps.tracing.instrumentation import instrument_engine
+from apps.tracing.middleware import TracingMiddleware
+from apps.tracing.provider import configure_tracing
+
+configure_logging()
+configure_tracing()
+instrument_engine(engine)
+instrument_engine(session_engine)
+
+logger = logging.getLogger(__name__)
+
+
+async def seed_admin():
+    async with async_session() as db:
+        await create_default_admin(db)
+
+
+async def warm_storage():
+    try:
+        # Builds the backend in a thread, importing aioboto3 would otherwise block the other startup steps
+        backend = await asyncio.to_thread(storage.resolve)
+        await backend.warm_up()
+    except Exception:
+        # Requests not touching storage can still be served
+        logger.warning("storage warm-up failed", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    await asyncio.gather(
+        warm_pool(engine, settings.STARTUP_WARM_CONNECTIONS),
+        warm_storage(),
+        seed_admin(),
+    )
+    app_startup_seconds.labels("import").set(started - _import_started)
+    app_startup_seconds.labels("lifespan").set(time.perf_counter() - started)
+    logger.info("startup complete", extra={
+        "import_seconds": round(started - _import_started, 3),
+        "lifespan_seconds": round(time.perf_counter() - started, 3),
+    })
+    yield
+    await asyncio.gather(engine.dispose(), session_engine.dispose())
+
+
+app = FastAPI(lifespan=lifespan)
+# Innermost, so profiles cover the app and not the other middleware
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(SiteIsolationMiddleware, sites_host=settings.SITES_HOST)
+# Inside the metrics middleware, so response sizes are recorded as sent
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(RequestLogMiddleware)
+registry.register(DatabasePoolCollector({"default": engine, "startup": session_engine}))
 
 # Allow CORS from all origins
 origins = os.getenv("ALLOWED_FRONTEND_ORIGINS", "http://127.0.0.1:5173").split(",")
@@ -20,19 +95,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# # Create Admin after project startup
-@app.on_event("startup")
-async def startup_event():
-    async with async_session() as db:
-        await create_default_admin(db)
-
 celery_app = Celery(
     "worker",
     broker=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
     backend=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
 )
 
-celery_app.autodiscover_tasks(['apps.send_email', 'apps.users', 'apps.projects'], related_name='tasks')
+# Task signals feeding the metrics served at /metrics
+import apps.metrics.celery  # noqa: F401
+import apps.logs.celery  # noqa: F401
+
+celery_app.autodiscover_tasks(['apps.send_email', 'apps.users', 'apps.projects', 'apps.outbox'], related_name='tasks')
+
+# One queue per workload so each gets its own workers, see docker-compose.yml.
+# apps/metrics/celery.py lists the same queues for the queue length gauge.
+# On Redis a lower priority number is consumed first.
+CELERY_QUEUES = ("email", "email_bulk", "projects", "maintenance")
+CELERY_ROUTES = {
+    "apps.send_email.tasks.send_bulk_email_task": {"queue": "email_bulk", "priority": 9},
+    "apps.send_email.tasks.*": {"queue": "email", "priority": 0},
+    "apps.projects.tasks.reconcile_storage_usage_task": {"queue": "maintenance"},
+    "apps.projects.tasks.expire_upload_sessions_task": {"queue": "maintenance"},
+    "apps.projects.tasks.*": {"queue": "projects"},
+    "apps.users.tasks.*": {"queue": "maintenance"},
+    "apps.outbox.tasks.*": {"queue": "maintenance"},
+}
 
 # Configure Celery to use JSON serialization
 celery_app.conf.update(
@@ -40,13 +127,35 @@ celery_app.conf.update(
     result_expires=360,
     timezone="UTC",
     enable_utc=True,
-    # beat_schedule={
-    #     "remove-expired-blacklisted-tokens-midnight": {
-    #         "task": "apps.users.tasks.remove_blacklisted_token_task",
-    #         "schedule": crontab(hour=12, minute=0),  # 12:00 AM
-    #     },
-    # },
+    beat_schedule={
+        # "remove-expired-blacklisted-tokens-midnight": {
+        #     "task": "apps.users.tasks.remove_blacklisted_token_task",
+        #     "schedule": crontab(hour=12, minute=0),  # 12:00 AM
+        # },
+        "reconcile-storage-usage-nightly": {
+            "task": "apps.projects.tasks.reconcile_storage_usage_task",
+            "schedule": crontab(hour=3, minute=0),
+        },
+        "expire-upload-sessions-hourly": {
+            "task": "apps.projects.tasks.expire_upload_sessions_task",
+            "schedule": crontab(minute=15),
+        },
+        "purge-sent-outbox-daily": {
+            "task": "apps.outbox.tasks.purge_sent_outbox_task",
+            "schedule": crontab(hour=4, minute=0),
+        },
+    },
+    task_queues=[Queue(name) for name in CELERY_QUEUES],
+    task_default_queue="maintenance",
+    task_routes=CELERY_ROUTES,
+    task_default_priority=5,
+    broker_transport_options={"priority_steps": list(range(10)), "queue_order_strategy": "priority"},
+    # Tasks are acknowledged after they finish so a crashed worker does not lose them,
+    # send_bulk_email_task opts out since redelivery would resend a whole batch
     task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Prefetch is set per worker in docker-compose.yml, this is the default for ad-hoc workers
+    worker_prefetch_multiplier=1,
 
     task_serializer="json",
     result_serializer="json",
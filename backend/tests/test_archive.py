@@ -0,0 +1,113 @@
+import io
+import stat
+import zipfile
+
+import pytest
+from fastapi import HTTPException
+
+from config import settings
+from apps.projects.services.archive import validate_zip
+
+
+def make_zip(files: dict, compression=zipfile.ZIP_DEFLATED) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        for name, data in files.items():
+            if isinstance(data, zipfile.ZipInfo):
+                archive.writestr(data, b"target")
+            else:
+                archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def rejected(file_obj) -> HTTPException:
+    with pytest.raises(HTTPException) as raised:
+        validate_zip(file_obj)
+    return raised.value
+
+
+def test_archive_root_holds_index_html():
+    info = validate_zip(make_zip({"index.html": b"<h1>hi</h1>", "css/site.css": b"body{}"}))
+
+    assert info.root == ""
+    assert sorted(entry.filename for entry in info.entries) == ["css/site.css", "index.html"]
+    assert info.total_size == len(b"<h1>hi</h1>") + len(b"body{}")
+
+
+def test_only_entries_below_a_nested_root_are_kept():
+    info = validate_zip(make_zip({"dist/index.html": b"<h1>hi</h1>", "dist/app.js": b"1", "README.md": b"notes"}))
+
+    assert info.root == "dist"
+    assert sorted(entry.filename for entry in info.entries) == ["dist/app.js", "dist/index.html"]
+    assert info.total_size == len(b"<h1>hi</h1>") + 1
+
+
+def test_invalid_archive():
+    assert rejected(io.BytesIO(b"not a zip")).status_code == 400
+
+
+@pytest.mark.parametrize("name", ["../index.html", "site/../../etc/passwd", "/etc/passwd", "site\\index.html", "C:/index.html"])
+def test_unsafe_paths(name):
+    error = rejected(make_zip({"index.html": b"x", name: b"x"}))
+
+    assert error.status_code == 400
+    assert "Unsafe path" in error.detail
+
+
+def test_symbolic_links():
+    link = zipfile.ZipInfo("link.html")
+    link.external_attr = (stat.S_IFLNK | 0o777) << 16
+
+    error = rejected(make_zip({"index.html": b"x", "link.html": link}))
+
+    assert error.status_code == 400
+    assert "Symbolic links" in error.detail
+
+
+@pytest.mark.parametrize("files, detail", [
+    ({}, "index.html not found"),
+    ({"a/index.html": b"x", "b/index.html": b"x"}, "Multiple index.html"),
+])
+def test_index_html_must_be_unique(files, detail):
+    error = rejected(make_zip({"notes.txt": b"x", **files}))
+
+    assert error.status_code == 400
+    assert detail in error.detail
+
+
+def test_entry_count_limit(monkeypatch):
+    monkeypatch.setattr(settings, "ZIP_MAX_ENTRIES", 2)
+
+    assert rejected(make_zip({"index.html": b"x", "a.js": b"x", "b.js": b"x"})).status_code == 413
+
+
+def test_entry_size_limit(monkeypatch):
+    monkeypatch.setattr(settings, "ZIP_MAX_ENTRY_BYTES", 10)
+
+    error = rejected(make_zip({"index.html": b"x" * 11}, zipfile.ZIP_STORED))
+
+    assert error.status_code == 413
+    assert "entry too large" in error.detail
+
+
+def test_total_size_limit(monkeypatch):
+    monkeypatch.setattr(settings, "ZIP_MAX_TOTAL_BYTES", 15)
+
+    error = rejected(make_zip({"index.html": b"x" * 10, "app.js": b"x" * 10}, zipfile.ZIP_STORED))
+
+    assert error.status_code == 413
+    assert "uncompressed size" in error.detail
+
+
+def test_compression_ratio_limit():
+    bomb = b"\0" * (4 * 1024 * 1024)
+
+    error = rejected(make_zip({"index.html": b"x", "bomb.bin": bomb}))
+
+    assert error.status_code == 400
+    assert "compression ratio" in error.detail
+
+
+def test_small_files_are_not_ratio_checked():
+    assert validate_zip(make_zip({"index.html": b" " * 60 * 1024})).total_size == 60 * 1024
@@ -0,0 +1,103 @@
+import gzip
+import json
+import zlib
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from apps.http.compression import CompressionMiddleware, choose_encoding, parse_accept_encoding
+
+PAYLOAD = json.dumps([{"id": n, "name": f"project {n}"} for n in range(200)]).encode()
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/json")
+    async def large_json():
+        return Response(PAYLOAD, media_type="application/json", headers={"ETag": '"v1"', "Vary": "Cookie"})
+
+    @app.get("/small")
+    async def small_json():
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    @app.get("/image")
+    async def image():
+        return Response(b"\x89PNG" + b"\0" * 4096, media_type="image/png")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for n in range(0, len(PAYLOAD), 1000):
+                yield PAYLOAD[n:n + 1000]
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/not-modified")
+    async def not_modified():
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+
+    app.add_middleware(CompressionMiddleware, min_size=1024)
+    return TestClient(app)
+
+
+def get(path: str, accept_encoding: str):
+    # Raw bytes as sent, the client would otherwise decode them
+    with make_client().stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.5, identity;q=0, x;q=bad") == {
+        "gzip": 1.0, "br": 0.5, "identity": 0.0, "x": 0.0,
+    }
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("*", "br"),
+    ("*, br;q=0", "gzip"),
+    ("identity", None),
+    ("gzip;q=0, br;q=0", None),
+    ("", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+@pytest.mark.parametrize("encoding, decode", [("br", brotli.decompress), ("gzip", gzip.decompress)])
+def test_large_json_is_compressed(encoding, decode):
+    response, body = get("/json", encoding)
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Cookie, Accept-Encoding"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert int(response.headers["content-length"]) == len(body) < len(PAYLOAD)
+    assert decode(body) == PAYLOAD
+
+
+def test_identity_leaves_the_response_alone():
+    response, body = get("/json", "identity")
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"'
+    assert body == PAYLOAD
+
+
+@pytest.mark.parametrize("path", ["/small", "/image", "/not-modified"])
+def test_small_binary_and_bodiless_responses_pass_through(path):
+    response, _ = get(path, "gzip, br")
+
+    assert "content-encoding" not in response.headers
+
+
+def test_streamed_responses_are_compressed_chunk_by_chunk():
+    response, body = get("/stream", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert zlib.decompress(body, 16 + zlib.MAX_WBITS) == PAYLOAD
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from starlette.requests import Request
+
+from apps.http.conditional import body_etag, is_conditional, not_modified, validator_headers, version_etag
+
+MODIFIED = datetime(2026, 10, 19, 12, 30, 15, 250000, tzinfo=timezone.utc)
+
+
+def request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_body_etag_is_strong_and_follows_the_body():
+    assert body_etag(b"a") == body_etag(b"a")
+    assert body_etag(b"a") != body_etag(b"b")
+    assert body_etag(b"a").startswith('"')
+
+
+def test_version_etag_is_weak_and_follows_every_part():
+    assert version_etag("projects", 2, 7, MODIFIED, 100, 3).startswith('W/"')
+    assert version_etag("projects", 2, 7, MODIFIED, 100, 3) != version_etag("projects", 2, 7, MODIFIED, 101, 3)
+
+
+def test_validator_headers():
+    headers = validator_headers('"abc"', MODIFIED, "private, no-cache")
+
+    assert headers == {
+        "ETag": '"abc"',
+        "Cache-Control": "private, no-cache",
+        "Last-Modified": "Mon, 19 Oct 2026 12:30:15 GMT",
+    }
+    assert "Last-Modified" not in validator_headers('"abc"')
+
+
+def test_is_conditional():
+    assert not is_conditional(request())
+    assert is_conditional(request(if_none_match='"abc"'))
+    assert is_conditional(request(if_modified_since="Mon, 19 Oct 2026 12:30:15 GMT"))
+
+
+@pytest.mark.parametrize("header", ['"abc"', 'W/"abc"', '"old", "abc"', "*"])
+def test_if_none_match_matches_weakly(header):
+    assert not_modified(request(if_none_match=header), '"abc"')
+    assert not_modified(request(if_none_match=header), 'W/"abc"')
+
+
+def test_if_none_match_mismatch():
+    assert not not_modified(request(if_none_match='"old"'), '"abc"')
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    since = format_datetime(MODIFIED + timedelta(days=1), usegmt=True)
+
+    assert not not_modified(request(if_none_match='"old"', if_modified_since=since), '"abc"', MODIFIED)
+
+
+def test_if_modified_since_compares_whole_seconds():
+    assert not_modified(request(if_modified_since="Mon, 19 Oct 2026 12:30:15 GMT"), '"abc"', MODIFIED)
+    assert not not_modified(request(if_modified_since="Mon, 19 Oct 2026 12:30:14 GMT"), '"abc"', MODIFIED)
+
+
+@pytest.mark.parametrize("since", ["yesterday", "Mon, 19 Oct 2026 12:30:15"])
+def test_unusable_if_modified_since_is_ignored(since):
+    assert not not_modified(request(if_modified_since=since), '"abc"', MODIFIED)
+
+
+def test_if_modified_since_without_last_modified():
+    assert not not_modified(request(if_modified_since="Mon, 19 Oct 2026 12:30:15 GMT"), '"abc"')
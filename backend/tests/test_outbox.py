@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+
+from config import settings
+from apps.logs.celery import propagate_request_id
+from apps.logs.handlers import request_id
+from apps.outbox.models import OutboxMessage
+from apps.outbox.relay import make_publisher
+from apps.outbox.services import _backoff, message_headers, outbox_insert, outbox_message_id, outbox_task_id
+from apps.tracing.instrumentation import propagate_trace
+
+tracer = TracerProvider().get_tracer(__name__)
+
+
+class RecordingCelery:
+    def __init__(self):
+        self.sent = []
+
+    def send_task(self, name, **options):
+        self.sent.append((name, options))
+
+
+def test_rows_keep_the_trace_context_of_the_request():
+    span = tracer.start_span("request")
+    with trace.use_span(span, end_on_exit=True):
+        headers = outbox_insert("apps.projects.tasks.purge_project_task", [1, "owner"]).compile().params["headers"]
+
+    assert headers["traceparent"].split("-")[1] == format(span.get_span_context().trace_id, "032x")
+
+
+def test_rows_outside_a_trace_carry_no_context():
+    assert "traceparent" not in message_headers()
+
+
+def test_relay_publishes_with_the_stored_headers_and_task_id():
+    celery = RecordingCelery()
+    message = OutboxMessage(id=7, task_name="apps.projects.tasks.ingest_upload_task", args=["sid"], kwargs={}, headers={"traceparent": "00-abc-def-01"})
+
+    make_publisher(celery, producer=None)(message)
+
+    name, options = celery.sent[0]
+    assert name == "apps.projects.tasks.ingest_upload_task"
+    assert options["headers"] == {"traceparent": "00-abc-def-01"}
+    assert options["task_id"] == outbox_task_id(7) == "outbox-7"
+
+
+def test_publish_hook_keeps_the_stored_trace_context():
+    headers = {"traceparent": "00-abc-def-01"}
+    with trace.use_span(tracer.start_span("relay"), end_on_exit=True):
+        propagate_trace(headers=headers)
+
+    assert headers["traceparent"] == "00-abc-def-01"
+
+
+def test_outbox_task_ids_round_trip():
+    assert outbox_message_id(outbox_task_id(42)) == 42
+    assert outbox_message_id("6f1c0e4e-celery-id") is None
+    assert outbox_message_id("outbox-") is None
+
+
+def test_backoff_doubles_up_to_an_hour():
+    base = settings.OUTBOX_RETRY_BASE_SECONDS
+    assert _backoff(1) == timedelta(seconds=base)
+    assert _backoff(3) == timedelta(seconds=base * 4)
+    assert _backoff(40) == timedelta(seconds=3600)
+
+
+def test_rows_keep_the_request_id():
+    token = request_id.set("req-123")
+    try:
+        headers = message_headers()
+    finally:
+        request_id.reset(token)
+
+    assert headers["request_id"] == "req-123"
+
+
+def test_publish_hook_keeps_the_stored_request_id():
+    headers = {"request_id": "req-123"}
+    token = request_id.set("relay")
+    try:
+        propagate_request_id(headers=headers)
+    finally:
+        request_id.reset(token)
+
+    assert headers["request_id"] == "req-123"
@@ -0,0 +1,54 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from apps.http.sites import SITE_PREFIX, SiteIsolationMiddleware
+
+
+def make_client(sites_host=None) -> TestClient:
+    app = FastAPI()
+
+    @app.get(SITE_PREFIX + "{name}/{path:path}")
+    async def site(name: str, path: str):
+        if path == "missing.html":
+            raise HTTPException(status_code=404, detail="File not found")
+        if path == "cached.html":
+            return Response(status_code=304)
+        return Response("<script>fetch('/api/v1/users/info')</script>", media_type="text/html")
+
+    @app.get("/api/v1/users/info")
+    async def info():
+        return {"email": "user@example.com"}
+
+    app.add_middleware(SiteIsolationMiddleware, sites_host=sites_host)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["index.html", "missing.html", "cached.html"])
+def test_every_site_response_is_sandboxed(path):
+    response = make_client().get(SITE_PREFIX + "demo/" + path)
+
+    assert response.headers["content-security-policy"] == "sandbox allow-scripts"
+    assert response.headers["x-content-type-options"] == "nosniff"
+
+
+def test_api_responses_are_not_sandboxed():
+    response = make_client().get("/api/v1/users/info")
+
+    assert response.status_code == 200
+    assert "content-security-policy" not in response.headers
+
+
+def test_sites_host_serves_only_sites():
+    client = make_client(sites_host="Sites.Example.net")
+
+    assert client.get(SITE_PREFIX + "demo/index.html", headers={"host": "sites.example.net:8443"}).status_code == 200
+    assert client.get("/api/v1/users/info", headers={"host": "sites.example.net"}).status_code == 404
+
+
+def test_api_host_does_not_serve_sites_when_sites_host_is_set():
+    client = make_client(sites_host="sites.example.net")
+
+    assert client.get(SITE_PREFIX + "demo/index.html", headers={"host": "api.example.com"}).status_code == 404
+    assert client.get("/api/v1/users/info", headers={"host": "api.example.com"}).status_code == 200
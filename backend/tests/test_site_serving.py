@@ -0,0 +1,96 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from apps.projects.services.cache import ByteLRUCache
+from apps.projects.services.storage import StoredObject
+from apps.projects.views import _parse_range, _unsafe_segment
+
+
+def stored(key: str, size: int) -> StoredObject:
+    return StoredObject(key=key, size=size, etag=key, last_modified=datetime.now(timezone.utc), body=b"x" * size)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-", (10, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=990-5000", (990, 999)),
+])
+def test_parse_range(header, expected):
+    assert _parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["items=0-9", "bytes=0-9,20-29", "bytes=a-b", "bytes=-0", "bytes=-"])
+def test_parse_range_ignores_unsupported_headers(header):
+    assert _parse_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", 1000),
+    ("bytes=20-10", 1000),
+    ("bytes=0-", 0),
+    ("bytes=-10", 0),
+])
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(HTTPException) as raised:
+        _parse_range(header, size)
+    assert raised.value.status_code == 416
+    assert raised.value.headers["Content-Range"] == f"bytes */{size}"
+
+
+@pytest.mark.parametrize("value", ["..", "../etc/passwd", "a/../b", "a\\b", "a\x00"])
+def test_unsafe_segment(value):
+    assert _unsafe_segment(value)
+
+
+@pytest.mark.parametrize("value", ["", "index.html", "a..b/c.html", "css/site.css"])
+def test_safe_segment(value):
+    assert not _unsafe_segment(value)
+
+
+def test_lru_evicts_least_recently_used_by_size():
+    cache = ByteLRUCache(max_bytes=300, max_object_bytes=200, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.put(stored(key, 100))
+    cache.get("a")
+    cache.put(stored("d", 100))
+
+    assert cache.get("b") is None
+    assert [key for key in ("a", "c", "d") if cache.get(key)] == ["a", "c", "d"]
+    assert cache.size == 300
+
+
+def test_lru_skips_large_objects_and_replaces_keys():
+    cache = ByteLRUCache(max_bytes=300, max_object_bytes=200, ttl=60)
+    cache.put(stored("big", 201))
+    cache.put(stored("a", 100))
+    cache.put(stored("a", 50))
+
+    assert cache.get("big") is None
+    assert cache.get("a").size == 50
+    assert cache.size == 50
+
+
+def test_lru_expires_entries(monkeypatch):
+    cache = ByteLRUCache(max_bytes=300, max_object_bytes=200, ttl=60)
+    cache.put(stored("a", 100))
+    now = time.monotonic()
+    monkeypatch.setattr("apps.projects.services.cache.time.monotonic", lambda: now + 61)
+
+    assert cache.get("a") is None
+    assert cache.size == 0
+
+
+def test_lru_invalidate_prefix():
+    cache = ByteLRUCache(max_bytes=1000, max_object_bytes=200, ttl=60)
+    for key in ("projects/a/index.html", "projects/a/app.js", "projects/ab/index.html"):
+        cache.put(stored(key, 10))
+    cache.invalidate_prefix("projects/a/")
+
+    assert cache.get("projects/a/index.html") is None
+    assert cache.get("projects/ab/index.html") is not None
+    assert cache.size == 10
@@ -0,0 +1,35 @@
+import io
+
+import pytest
+
+from apps.projects.services.storage import LazyStorage, MemoryStorage, StorageBackend
+
+
+def test_lazy_storage_hides_no_backend_attribute():
+    # Anything defined on the proxy is found before __getattr__ reaches the backend
+    own = {name for name in vars(LazyStorage) if not name.startswith("__")}
+    assert not own & set(dir(StorageBackend))
+
+
+def test_lazy_storage_builds_backend_once_on_first_use():
+    built = []
+
+    def factory():
+        built.append(MemoryStorage())
+        return built[-1]
+
+    storage = LazyStorage(factory)
+    assert built == []
+    assert storage.resolve() is storage.resolve()
+    assert len(built) == 1
+
+
+@pytest.mark.anyio
+async def test_lazy_storage_delegates_get():
+    storage = LazyStorage(MemoryStorage)
+    await storage.add(io.BytesIO(b"<p>hi</p>"), "projects/site/index.html")
+
+    obj = await storage.get("projects/site/index.html")
+
+    assert obj.body == b"<p>hi</p>"
+    assert await storage.get("projects/site/missing.html") is None
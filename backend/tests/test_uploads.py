@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from config import settings
+from apps.projects.models import UploadSession, UploadStatus
+from apps.projects.services import uploads
+
+MB = 1024 * 1024
+
+
+class PartsDB:
+    """Answers describe_session's query with the given part number -> size."""
+
+    def __init__(self, parts: dict[int, int] | None = None):
+        self.parts = parts or {}
+
+    async def execute(self, statement):
+        return SimpleNamespace(all=lambda: list(self.parts.items()))
+
+
+def session(total_size: int, chunk_size: int = 5 * MB) -> UploadSession:
+    return UploadSession(
+        id="3f0c", owner_id="u", project_name="site", filename="site.zip", storage_key="staging/3f0c/site.zip",
+        storage_upload_id="mp-1", total_size=total_size, chunk_size=chunk_size, status=UploadStatus.OPEN,
+    )
+
+
+@pytest.mark.parametrize("total_size, expected", [(1, 1), (5 * MB, 1), (5 * MB + 1, 2), (12 * MB, 3)])
+def test_part_count(total_size, expected):
+    assert session(total_size).part_count == expected
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("index.html", settings.MAX_FILE_SIZE),
+    ("site.zip", min(settings.UPLOAD_MAX_SIZE, settings.ZIP_MAX_TOTAL_BYTES)),
+])
+def test_sessions_are_capped_at_publishable_sizes(filename, expected):
+    assert uploads._max_upload_size(filename) == expected
+
+
+@pytest.mark.anyio
+async def test_sessions_above_the_cap_are_rejected_before_any_query():
+    body = SimpleNamespace(filename="index.html", total_size=settings.MAX_FILE_SIZE + 1, name="site", project_id=None)
+
+    with pytest.raises(HTTPException) as raised:
+        await uploads._new_session(None, "u", body, 5 * MB)
+
+    assert raised.value.status_code == 413
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("part_number, size", [(0, 5 * MB), (4, 2 * MB), (1, 5 * MB - 1), (3, 5 * MB)])
+async def test_store_part_checks_number_and_size(part_number, size):
+    with pytest.raises(HTTPException) as raised:
+        await uploads.store_part(PartsDB(), session(12 * MB), part_number, b"x" * size)
+
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_describe_session_resumes_after_the_first_gap():
+    described = await uploads.describe_session(PartsDB({1: 5 * MB, 3: 2 * MB}), session(12 * MB))
+
+    assert described["received_parts"] == [1, 3]
+    assert described["missing_parts"] == [2]
+    assert described["received_bytes"] == 7 * MB
+    assert described["offset"] == 5 * MB
+    assert described["mode"] == "chunked"
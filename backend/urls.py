@@ -2,12 +2,16 @@ from fastapi import APIRouter
 from apps.users.urls import router as users_router
 from apps.send_email.urls import router as email_router
 from apps.projects.urls import router as projects_router
+from apps.metrics.urls import router as metrics_router
+from apps.profiling.urls import router as profiling_router
 
 api_v1_router = APIRouter()
 
 api_v1_router.include_router(users_router, prefix="/users", tags=["Users"])
 api_v1_router.include_router(email_router, prefix="/email", tags=["Email"])
 api_v1_router.include_router(projects_router, prefix="/projects", tags=["Projects"])
+api_v1_router.include_router(profiling_router, prefix="/profiling", tags=["Profiling"])
 
 root_router = APIRouter()
-root_router.include_router(api_v1_router, prefix="/api/v1")
\ No newline at end of file
+root_router.include_router(api_v1_router, prefix="/api/v1")
+root_router.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
\ No newline at end of file